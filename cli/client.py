@@ -1,4 +1,4 @@
-import cmd2, getpass, json, os, requests, webbrowser
+import base64, cmd2, concurrent.futures, hashlib, json, os, threading, time
 
 # Single signer
 # python client.py sign document.pdf --signer signe.tester@folksam.se "Signe Tester" DIRECT_SIGNING
@@ -8,34 +8,147 @@ import cmd2, getpass, json, os, requests, webbrowser
 #     --signer signe.tester@folksam.se "Signe Tester" DIRECT_SIGNING \
 #     --signer another.tester@folksam.se "Another Tester" EMAIL_NOTIFICATION
 
+TOKEN_FILE = os.path.expanduser("~/.document_signing_token")
+
+# orjson is an optional speedup for request bodies and larger responses
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _dumps(obj):
+    return orjson.dumps(obj).decode() if orjson else json.dumps(obj)
+
+def _loads(data):
+    return orjson.loads(data) if orjson else json.loads(data)
+
 class DocumentSigningClient(cmd2.Cmd):
     """CLI client for document signing API with multiple service providers"""
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.base_url = "http://localhost:8000"
-        self.session = requests.Session()
+        self._url = {
+            'login': f'{self.base_url}/api/auth/login',
+            'services': f'{self.base_url}/api/services',
+            'sign': f'{self.base_url}/api/{{service}}/sign',
+            'status': f'{self.base_url}/api/{{service}}/documents/{{doc}}/status',
+            'download': f'{self.base_url}/api/{{service}}/documents/{{doc}}/download',
+            'search': f'{self.base_url}/api/signatures/search',
+            'health': f'{self.base_url}/api/health'
+        }
+        self._session = None
         self.current_service = "scrive"  # Default service
         self.last_document_id = None
         self.last_signing_url = None
         self.token = None
+        self.token_exp = None
         self.authenticated = False
 
         # Set up command categories
         self.intro = "Document Signing CLI - Type 'help' for available commands"
 
+        # Reuse the token from a previous run if it has not expired
+        self._load_token()
+
+    @property
+    def session(self):
+        """HTTP session, created on first use so commands that don't hit the server skip importing requests"""
+        if self._session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            self._session = requests.Session()
+            # Larger keep-alive pool and retries on transient gateway errors.
+            # Only idempotent methods are retried so a sign request is never submitted twice.
+            retry = Retry(total=3, backoff_factor=0.2, status_forcelist=(502, 503, 504))
+            adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=retry)
+            self._session.mount('http://', adapter)
+            self._session.mount('https://', adapter)
+            self._session.headers.update({
+                'Connection': 'keep-alive',
+                'Accept': 'application/json',
+                'User-Agent': 'doc-sign-cli/1.0'
+            })
+            self._update_auth_headers()
+        return self._session
+
+    def _load_token(self):
+        """Load a saved access token from disk"""
+        try:
+            with open(TOKEN_FILE) as f:
+                token_data = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        if token_data.get('exp') and time.time() < token_data['exp'] - 30:
+            self.token = token_data['access_token']
+            self.token_exp = token_data['exp']
+            self.authenticated = True
+            self._update_auth_headers()
+
+    def _save_token(self):
+        """Save the access token to disk, readable only by the current user"""
+        try:
+            fd = os.open(TOKEN_FILE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w') as f:
+                json.dump({"access_token": self.token, "exp": self.token_exp}, f)
+        except OSError as e:
+            self.poutput(f"⚠️  Could not save token: {e}")
+
+    def _clear_token(self):
+        """Forget the access token in memory and on disk"""
+        self.token = None
+        self.token_exp = None
+        self.authenticated = False
+        self._update_auth_headers()
+        try:
+            os.remove(TOKEN_FILE)
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _token_expiry(token):
+        """Read the exp claim from a JWT without verifying it"""
+        payload = token.split('.')[1]
+        return json.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4))).get('exp')
+
     def _update_auth_headers(self):
         """Update session headers with authentication token"""
+        if self._session is None:
+            return  # Applied when the session is created
+
         if self.token:
-            self.session.headers.update({"Authorization": f"Bearer {self.token}"})
+            self._session.headers["Authorization"] = f"Bearer {self.token}"
         else:
-            self.session.headers.pop("Authorization", None)
+            self._session.headers.pop("Authorization", None)
+
+    @staticmethod
+    def _open_in_browser(url):
+        """Open a URL in the browser without waiting for it to start"""
+        import webbrowser
+
+        # Not a daemon thread, so one-shot invocations still open the browser before exiting
+        threading.Thread(target=webbrowser.open, args=(url,)).start()
+
+    @staticmethod
+    def _decode_error(response):
+        """Return the JSON error body of a response, or its text if it is not JSON"""
+        try:
+            return response.json()
+        except ValueError:
+            return response.text
 
     def _check_auth(self):
         """Check if user is authenticated for protected commands"""
         if not self.authenticated:
             self.poutput("❌ Authentication required. Please login first using 'login' command.")
             return False
+        if self.token_exp and time.time() > self.token_exp - 30:
+            self._clear_token()
+            self.poutput("❌ Session expired. Please login again using 'login' command.")
+            return False
         return True
 
     # Authentication commands
@@ -51,11 +164,14 @@ class DocumentSigningClient(cmd2.Cmd):
             return
 
         # Use getpass for secure password input (doesn't echo to terminal)
+        import getpass
         password = getpass.getpass("Password: ")
         if not password:
             self.poutput("❌ Password cannot be empty")
             return
 
+        import requests
+
         try:
             # Prepare login data
             login_data = {
@@ -65,23 +181,28 @@ class DocumentSigningClient(cmd2.Cmd):
 
             # Make login request
             response = self.session.post(
-                f"{self.base_url}/api/auth/login",
-                json=login_data,
-                headers={"Content-Type": "application/json"}
+                self._url['login'],
+                json=login_data
             )
 
             if response.status_code == 200:
                 token_data = response.json()
                 self.token = token_data["access_token"]
+                self.token_exp = self._token_expiry(self.token)
                 self.authenticated = True
                 self._update_auth_headers()
+                self._save_token()
 
                 self.poutput("✅ Login successful!")
                 self.poutput(f"Token type: {token_data.get('token_type', 'bearer')}")
                 self.poutput("\n🎉 You can now use authenticated commands")
             else:
-                error_data = response.json() if response.headers.get('content-type') == 'application/json' else {}
-                error_msg = error_data.get('detail', f'HTTP {response.status_code}')
+                error_data = self._decode_error(response)
+                if isinstance(error_data, dict):
+                    # The API wraps HTTP errors as {"error": ...}; FastAPI's own are {"detail": ...}
+                    error_msg = error_data.get('error') or error_data.get('detail') or f'HTTP {response.status_code}'
+                else:
+                    error_msg = f'HTTP {response.status_code}'
                 self.poutput(f"❌ Login failed: {error_msg}")
 
         except requests.exceptions.ConnectionError:
@@ -95,9 +216,7 @@ class DocumentSigningClient(cmd2.Cmd):
 
     def do_logout(self, args):
         """Logout and clear authentication"""
-        self.token = None
-        self.authenticated = False
-        self._update_auth_headers()
+        self._clear_token()
         self.poutput("✅ Logged out successfully")
 
     def do_auth_status(self, args):
@@ -125,8 +244,11 @@ class DocumentSigningClient(cmd2.Cmd):
 
     def do_services(self, args):
         """List supported services from the server"""
+        if not self._check_auth():
+            return
+
         try:
-            url = f"{self.base_url}/api/services"
+            url = self._url['services']
             response = self.session.get(url)
 
             if response.status_code == 200:
@@ -143,7 +265,7 @@ class DocumentSigningClient(cmd2.Cmd):
 
     # Document signing commands
     sign_parser = cmd2.Cmd2ArgumentParser()
-    sign_parser.add_argument('document_path', help='Path to PDF document')
+    sign_parser.add_argument('document_path', nargs='+', help='Path to PDF document (several documents are uploaded in parallel)')
     sign_parser.add_argument('--signer', action='append', nargs=3,
                              metavar=('EMAIL', 'NAME', 'MODE'),
                              help='Add a signer: email name mode (can be used multiple times)')
@@ -157,6 +279,9 @@ class DocumentSigningClient(cmd2.Cmd):
     @cmd2.with_argparser(sign_parser)
     def do_sign(self, args):
         """Initiate document signing process with multiple signers and optional metadata"""
+        if not self._check_auth():
+            return
+
         service = args.service if args.service else self.current_service
 
         if not args.signer:
@@ -166,14 +291,8 @@ class DocumentSigningClient(cmd2.Cmd):
 
         try:
             # Build signers list
-            signers = []
-            for signer_info in args.signer:
-                email, name, mode = signer_info
-                signers.append({
-                    "signer_email": email,
-                    "signer_name": name,
-                    "mode": mode
-                })
+            signers = [{"signer_email": email, "signer_name": name, "mode": mode}
+                       for email, name, mode in args.signer]
 
             # Build metadata dictionary
             metadata = {}
@@ -187,53 +306,76 @@ class DocumentSigningClient(cmd2.Cmd):
 
             print("Metadata:" + str(metadata))
 
-            url = f"{self.base_url}/api/{service}/sign"
+            url = self._url['sign'].format(service=service)
 
-            # Read file content first
-            with open(args.document_path, 'rb') as f:
-                file_content = f.read()
-
-            # Prepare form data with proper multipart structure
-            files = {
-                'document': (args.document_path, file_content, 'application/pdf')
-            }
-            data = {
-                'signers': json.dumps(signers)
-            }
+            # Form fields shared by every document in this request
+            form = {'signers': _dumps(signers)}
 
             # Add metadata if provided
             if metadata:
-                data['metadata'] = json.dumps(metadata)
-
-            response = self.session.post(url, files=files, data=data)
-
-            if response.status_code == 200:
-                result = response.json()
-                self.last_document_id = result['document_id']
-
-                self.poutput(f"✅ Document signing initiated with {service}")
-                self.poutput(f"📄 Document ID: {result['document_id']}")
-
-                # Show metadata if provided
-                if metadata:
-                    self.poutput(f"🏷️  Metadata: {metadata}")
-
-                self.poutput(f"👥 Signers ({len(result['signing_urls'])}):")
-
-                for i, signer_info in enumerate(result['signing_urls']):
-                    self.poutput(f"  {i+1}. {signer_info['signer_email']} ({signer_info.get('signing_url', 'Email notification')})")
-                    if signer_info.get('signing_url'):
-                        self.last_signing_url = signer_info['signing_url']
-            else:
-                error_data = response.json() if response.headers.get('content-type', '').startswith('application/json') else response.text
-                self.poutput(f"❌ Error: {response.status_code}")
-                self.poutput(f"Details: {error_data}")
+                form['metadata'] = _dumps(metadata)
+
+            # Resolve the lazily created session here, so worker threads never race to build it
+            session = self.session
+            results = {}
+
+            # Upload all documents in parallel and report each one as it completes
+            with concurrent.futures.ThreadPoolExecutor(max_workers=min(8, len(args.document_path))) as executor:
+                futures = {executor.submit(self._upload_document, session, url, path, form): path
+                           for path in args.document_path}
+
+                for future in concurrent.futures.as_completed(futures):
+                    document_path = futures[future]
+                    if len(args.document_path) > 1:
+                        self.poutput(f"\n📁 {document_path}")
+
+                    try:
+                        response = future.result()
+                    except FileNotFoundError:
+                        self.poutput(f"❌ Error: File not found: {document_path}")
+                        continue
+                    except Exception as e:
+                        self.poutput(f"❌ Error: {e}")
+                        continue
+
+                    if response.status_code == 200:
+                        result = _loads(response.content)
+                        results[document_path] = result
+
+                        self.poutput(f"✅ Document signing initiated with {service}")
+                        self.poutput(f"📄 Document ID: {result['document_id']}")
+
+                        # Show metadata if provided
+                        if metadata:
+                            self.poutput(f"🏷️  Metadata: {metadata}")
+
+                        self.poutput(f"👥 Signers ({len(result['signing_urls'])}):")
+
+                        for i, signer_info in enumerate(result['signing_urls']):
+                            self.poutput(f"  {i+1}. {signer_info['signer_email']} ({signer_info.get('signing_url', 'Email notification')})")
+                    else:
+                        error_data = self._decode_error(response)
+                        self.poutput(f"❌ Error: {response.status_code}")
+                        self.poutput(f"Details: {error_data}")
+
+            # Remember the last document/signing URL in argument order, not completion order
+            for document_path in args.document_path:
+                result = results.get(document_path)
+                if result:
+                    self.last_document_id = result['document_id']
+                    for signer_info in result['signing_urls']:
+                        if signer_info.get('signing_url'):
+                            self.last_signing_url = signer_info['signing_url']
 
-        except FileNotFoundError:
-            self.poutput(f"❌ Error: File not found: {args.document_path}")
         except Exception as e:
             self.poutput(f"❌ Error: {e}")
 
+    def _upload_document(self, session, url, document_path, form):
+        """Post one document with the given form fields"""
+        with open(document_path, 'rb') as f:
+            files = {'document': (os.path.basename(document_path), f, 'application/pdf')}
+            return session.post(url, files=files, data=form)
+
 
     # Document status commands
     status_parser = cmd2.Cmd2ArgumentParser()
@@ -243,6 +385,9 @@ class DocumentSigningClient(cmd2.Cmd):
     @cmd2.with_argparser(status_parser)
     def do_status(self, args):
         """Get document status"""
+        if not self._check_auth():
+            return
+
         document_id = args.document_id if args.document_id else self.last_document_id
         service = args.service if args.service else self.current_service
 
@@ -251,34 +396,67 @@ class DocumentSigningClient(cmd2.Cmd):
             return
 
         try:
-            url = f"{self.base_url}/api/{service}/documents/{document_id}/status"
+            url = self._url['status'].format(service=service, doc=document_id)
             response = self.session.get(url)
 
-            if response.status_code == 200:
-                status = response.json()
-                self.poutput(f"📄 Document ID: {status['document_id']}")
-                self.poutput(f"🔧 Service: {status['service']}")
-                self.poutput(f"📊 Status: {status['status']}")
-                self.poutput(f"✍️  Signed: {'Yes' if status['signed'] else 'No'}")
-
-                # Display signer information if available
-                if status.get('signers'):
-                    self.poutput("👥 Signers:")
-                    for i, signer in enumerate(status['signers']):
-                        signed_status = "✅ Signed" if signer.get('signed') else "⏳ Pending"
-                        self.poutput(f"  {i+1}. {signer.get('name', 'Unknown')} ({signer.get('email', 'Unknown')})")
-                        self.poutput(f"     Status: {signed_status}")
-                        if signer.get('signed_at'):
-                            self.poutput(f"     Signed at: {signer['signed_at']}")
-
-            else:
-                error_data = response.json() if response.headers.get('content-type', '').startswith('application/json') else response.text
-                self.poutput(f"❌ Error: {response.status_code}")
-                self.poutput(f"Details: {error_data}")
+            self._print_status(response)
 
         except Exception as e:
             self.poutput(f"❌ Error: {e}")
 
+    status_all_parser = cmd2.Cmd2ArgumentParser()
+    status_all_parser.add_argument('document_ids', nargs='+', help='Document IDs to check')
+    status_all_parser.add_argument('--service', help='Override current service for this request')
+
+    @cmd2.with_argparser(status_all_parser)
+    def do_status_all(self, args):
+        """Get the status of several documents concurrently"""
+        if not self._check_auth():
+            return
+
+        service = args.service if args.service else self.current_service
+        urls = [self._url['status'].format(service=service, doc=document_id) for document_id in args.document_ids]
+
+        # Fetch all statuses in parallel over the pooled session, print in request order
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(8, len(urls))) as executor:
+            futures = [executor.submit(self.session.get, url) for url in urls]
+
+            for document_id, future in zip(args.document_ids, futures):
+                try:
+                    self._print_status(future.result())
+                except Exception as e:
+                    self.poutput(f"❌ Error ({document_id}): {e}")
+                self.poutput("")
+
+    def _print_status(self, response):
+        """Print a document status response"""
+        if response.status_code == 200:
+            status = _loads(response.content)
+            lines = [
+                f"📄 Document ID: {status['document_id']}",
+                f"🔧 Service: {status['service']}",
+                f"📊 Status: {status['status']}",
+                f"✍️  Signed: {'Yes' if status['signed'] else 'No'}"
+            ]
+
+            # Display signer information if available
+            if status.get('signers'):
+                lines.append("👥 Signers:")
+                for i, signer in enumerate(status['signers']):
+                    signed_status = "✅ Signed" if signer.get('signed') else "⏳ Pending"
+                    lines.append(f"  {i+1}. {signer.get('name', 'Unknown')} ({signer.get('email', 'Unknown')})")
+                    lines.append(f"     Status: {signed_status}")
+                    if signer.get('signed_at'):
+                        lines.append(f"     Signed at: {signer['signed_at']}")
+
+            # Write the whole block at once rather than line by line
+            self.poutput('\n'.join(lines))
+
+        else:
+            error_data = self._decode_error(response)
+            self.poutput(f"❌ Error: {response.status_code}")
+            self.poutput(f"Details: {error_data}")
+
     # Download commands
     download_parser = cmd2.Cmd2ArgumentParser()
     download_parser.add_argument('document_id', nargs='?', help='Document ID (uses last document if not provided)')
@@ -288,6 +466,9 @@ class DocumentSigningClient(cmd2.Cmd):
     @cmd2.with_argparser(download_parser)
     def do_download(self, args):
         """Download signed document"""
+        if not self._check_auth():
+            return
+
         document_id = args.document_id if args.document_id else self.last_document_id
         service = args.service if args.service else self.current_service
 
@@ -296,23 +477,58 @@ class DocumentSigningClient(cmd2.Cmd):
             return
 
         try:
-            url = f"{self.base_url}/api/{service}/documents/{document_id}/download"
-            response = self.session.get(url)
-
-            if response.status_code == 200:
-                output_path = args.output or f"downloads/signed_document_{document_id}.pdf"
-                with open(output_path, 'wb') as f:
-                    f.write(response.content)
-                self.poutput(f"✅ Document downloaded: {output_path}")
-                webbrowser.open('file://' + os.path.realpath(output_path))
-            else:
-                error_data = response.json() if response.headers.get('content-type', '').startswith('application/json') else response.text
-                self.poutput(f"❌ Error: {response.status_code}")
-                self.poutput(f"Details: {error_data}")
+            url = self._url['download'].format(service=service, doc=document_id)
+            with self.session.get(url, stream=True) as response:
+                if response.status_code == 200:
+                    output_path = args.output or f"downloads/signed_document_{document_id}.pdf"
+                    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+
+                    # Write the document to disk as it arrives, hashing it on the way
+                    digest = hashlib.sha256()
+                    with open(output_path, 'wb') as f:
+                        for chunk in response.iter_content(chunk_size=1 << 20):
+                            if chunk:
+                                digest.update(chunk)
+                                f.write(chunk)
+                    self.poutput(f"✅ Document downloaded: {output_path}")
+                    self.poutput(f"🔒 SHA-256: {digest.hexdigest()}")
+                    self._open_in_browser('file://' + os.path.realpath(output_path))
+                else:
+                    error_data = self._decode_error(response)
+                    self.poutput(f"❌ Error: {response.status_code}")
+                    self.poutput(f"Details: {error_data}")
 
         except Exception as e:
             self.poutput(f"❌ Error: {e}")
 
+    # Batch commands
+    batch_parser = cmd2.Cmd2ArgumentParser()
+    batch_parser.add_argument('script_path', help='File with one command per line')
+
+    @cmd2.with_argparser(batch_parser)
+    def do_batch(self, args):
+        """Run commands from a file, checking consecutive document statuses concurrently"""
+        try:
+            with open(args.script_path) as f:
+                commands = [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+        except OSError as e:
+            self.poutput(f"❌ Error: {e}")
+            return
+
+        # Consecutive "status <id>" lines are collected and sent together via status_all
+        pending_ids = []
+        for command in commands + [None]:
+            parts = command.split() if command else []
+            if len(parts) == 2 and parts[0] == 'status':
+                pending_ids.append(parts[1])
+                continue
+
+            if pending_ids:
+                self.onecmd_plus_hooks('status_all ' + ' '.join(pending_ids))
+                pending_ids = []
+            if command:
+                self.onecmd_plus_hooks(command)
+
     def do_open(self, args):
         """Open the last signing URL in browser"""
         if not self.last_signing_url:
@@ -320,7 +536,7 @@ class DocumentSigningClient(cmd2.Cmd):
             return
 
         self.poutput(f"🌐 Opening: {self.last_signing_url}")
-        webbrowser.open(self.last_signing_url)
+        self._open_in_browser(self.last_signing_url)
 
     # Document search commands
     search_parser = cmd2.Cmd2ArgumentParser()
@@ -332,79 +548,75 @@ class DocumentSigningClient(cmd2.Cmd):
     search_parser.add_argument('--limit', type=int, default=50, help='Maximum number of results (default: 50)')
     search_parser.add_argument('--offset', type=int, default=0, help='Offset for pagination (default: 0)')
 
+    SEARCH_PARAMS = ('handler', 'service', 'system', 'status', 'title', 'limit', 'offset')
+
     @cmd2.with_argparser(search_parser)
     def do_search(self, args):
         """Search documents based on metadata"""
+        if not self._check_auth():
+            return
+
         service = args.service if args.service else self.current_service
 
         try:
-            # Build query parameters
-            params = {}
-            if args.handler:
-                params['handler'] = args.handler
-            if args.service:
-                params['service'] = args.service
-            if args.system:
-                params['system'] = args.system
-            if args.status:
-                params['status'] = args.status
-            if args.title:
-                params['title'] = args.title
-            if args.limit:
-                params['limit'] = args.limit
-            if args.offset:
-                params['offset'] = args.offset
+            # Build query parameters from the options that were given
+            params = {key: value for key in self.SEARCH_PARAMS
+                      if (value := getattr(args, key, None)) is not None}
 
             if not params:
                 self.poutput("❌ Error: At least one search parameter is required")
                 self.poutput("Use --help to see available search options")
                 return
 
-            url = f"{self.base_url}/api/signatures/search"
+            url = self._url['search']
             response = self.session.get(url, params=params)
 
             if response.status_code == 200:
-                result = response.json()
+                result = _loads(response.content)
                 results = result['results']
                 search_params = result['search_params']
 
-                self.poutput(f"🔍 Search Results ({len(results)} found)")
-                self.poutput(f"🔧 Service: {service}")
+                lines = [
+                    f"🔍 Search Results ({len(results)} found)",
+                    f"🔧 Service: {service}"
+                ]
 
                 # Show search parameters
                 if search_params:
-                    self.poutput("📋 Search Parameters:")
+                    lines.append("📋 Search Parameters:")
                     for key, value in search_params.items():
-                        self.poutput(f"  {key}: {value}")
+                        lines.append(f"  {key}: {value}")
 
                 if not results:
-                    self.poutput("📄 No documents found matching the criteria")
-                    return
-
-                # Display results
-                self.poutput(f"\n📄 Documents:")
-                for i, doc in enumerate(results, 1):
-                    self.poutput(f"\n{i}. {doc['title']} (ID: {doc['document_id']})")
-                    self.poutput(f"   Status: {doc['status']}")
-                    self.poutput(f"   Created: {doc.get('created_at', 'Unknown')}")
-
-                    # Show metadata
-                    if doc.get('metadata'):
-                        self.poutput("   Metadata:")
-                        for key, value in doc['metadata'].items():
-                            if key != 'title':  # Don't duplicate title
-                                self.poutput(f"     {key}: {value}")
-
-                # Show pagination info
-                if result.get('limit') or result.get('offset'):
-                    self.poutput(f"\n📊 Showing results {result.get('offset', 0) + 1}-{result.get('offset', 0) + len(results)}")
-                    if len(results) == result.get('limit', 50):
-                        self.poutput("   Use --offset to see more results")
+                    lines.append("📄 No documents found matching the criteria")
+                else:
+                    # Display results
+                    lines.append(f"\n📄 Documents:")
+                    for i, doc in enumerate(results, 1):
+                        lines.append(f"\n{i}. {doc['title']} (ID: {doc['document_id']})")
+                        lines.append(f"   Status: {doc['status']}")
+                        lines.append(f"   Created: {doc.get('created_at', 'Unknown')}")
+
+                        # Show metadata
+                        if doc.get('metadata'):
+                            lines.append("   Metadata:")
+                            for key, value in doc['metadata'].items():
+                                if key != 'title':  # Don't duplicate title
+                                    lines.append(f"     {key}: {value}")
+
+                    # Show pagination info
+                    if result.get('limit') or result.get('offset'):
+                        lines.append(f"\n📊 Showing results {result.get('offset', 0) + 1}-{result.get('offset', 0) + len(results)}")
+                        if len(results) == result.get('limit', 50):
+                            lines.append("   Use --offset to see more results")
+
+                # Write the whole result set at once rather than line by line
+                self.poutput('\n'.join(lines))
 
             elif response.status_code == 501:
                 self.poutput(f"❌ Search not implemented for {service} service yet")
             else:
-                error_data = response.json() if response.headers.get('content-type', '').startswith('application/json') else response.text
+                error_data = self._decode_error(response)
                 self.poutput(f"❌ Error: {response.status_code}")
                 self.poutput(f"Details: {error_data}")
 
@@ -413,6 +625,9 @@ class DocumentSigningClient(cmd2.Cmd):
 
     def do_find(self, args):
         """Quick search by document title or ID"""
+        if not self._check_auth():
+            return
+
         if not args:
             self.poutput("❌ Error: Please provide a search term")
             self.poutput("Usage: find <title_or_id>")
@@ -422,12 +637,12 @@ class DocumentSigningClient(cmd2.Cmd):
 
         # Try to search by title first
         try:
-            url = f"{self.base_url}/api/signatures/search"
+            url = self._url['search']
             params = {'title': search_term, 'limit': 10}
             response = self.session.get(url, params=params)
 
             if response.status_code == 200:
-                result = response.json()
+                result = _loads(response.content)
                 results = result['results']
 
                 if results:
@@ -445,7 +660,7 @@ class DocumentSigningClient(cmd2.Cmd):
     def do_health(self, args):
         """Check API health"""
         try:
-            url = f"{self.base_url}/api/health"
+            url = self._url['health']
             response = self.session.get(url)
 
             if response.status_code == 200:
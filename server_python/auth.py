@@ -1,11 +1,14 @@
 # auth.py
+import asyncio, os, time
+from hashlib import blake2b
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.asynchronous.database import AsyncDatabase
 from database import get_database
 import crud
 from models import TokenData, UserInDB
@@ -15,17 +18,51 @@ SECRET_KEY = "top-secret"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing: argon2id for new hashes, bcrypt kept so existing hashes still verify
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    deprecated="auto",
+    argon2__memory_cost=65536,
+    argon2__time_cost=3,
+    argon2__parallelism=4,
+    bcrypt__rounds=BCRYPT_ROUNDS,
+)
+
+# argon2 and bcrypt both release the GIL, so hashing on a thread pool keeps the event loop free
+_BCRYPT_POOL = ThreadPoolExecutor(max_workers=os.cpu_count(), thread_name_prefix="bcrypt")
+
+# Verified against when the email is unknown, so that path costs a full hash check too
+_DUMMY_HASH = pwd_context.hash("dummy-password-for-timing")
+# Failed logins take at least this long, masking the remaining lookup/hash differences
+AUTH_FAILURE_MIN_SECONDS = float(os.getenv("AUTH_FAILURE_MIN_SECONDS", "0.25"))
 
 # Token scheme
 security = HTTPBearer()
 
+# Short-lived cache of the user behind a bearer token, keyed by a digest of the token so
+# raw tokens are never kept; saves the users lookup on back-to-back authenticated calls
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "30"))
+USER_CACHE_MAXSIZE = 10_000
+_user_cache: Dict[bytes, Tuple[float, UserInDB]] = {}
+
+def _cache_user(key: bytes, user: UserInDB) -> None:
+    if len(_user_cache) >= USER_CACHE_MAXSIZE:
+        # Dicts keep insertion order, so this drops the oldest entry
+        _user_cache.pop(next(iter(_user_cache)))
+    _user_cache[key] = (time.monotonic() + USER_CACHE_TTL, user)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+async def verify_and_update_password_async(plain_password: str, hashed_password: str):
+    """Returns (valid, new_hash); new_hash is set when the stored hash uses a deprecated scheme"""
+    return await asyncio.get_running_loop().run_in_executor(
+        _BCRYPT_POOL, pwd_context.verify_and_update, plain_password, hashed_password
+    )
+
+async def get_password_hash_async(password: str) -> str:
+    return await asyncio.get_running_loop().run_in_executor(_BCRYPT_POOL, pwd_context.hash, password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -37,17 +74,26 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def authenticate_user(db: AsyncIOMotorDatabase, email: str, password: str) -> Optional[UserInDB]:
+async def authenticate_user(db: AsyncDatabase, email: str, password: str) -> Optional[UserInDB]:
+    started = time.perf_counter()
     user = await crud.get_user_by_email(db, email)
-    if not user:
-        return None
-    if not verify_password(password, user.hashed_password):
+    # passlib compares digests in constant time; hash even for unknown users so both
+    # failure paths cost the same
+    valid, new_hash = await verify_and_update_password_async(
+        password, user.hashed_password if user else _DUMMY_HASH
+    )
+    if not user or not valid:
+        await asyncio.sleep(max(0.0, AUTH_FAILURE_MIN_SECONDS - (time.perf_counter() - started)))
         return None
+    if new_hash:
+        # Upgrade legacy bcrypt hashes to argon2 on successful login
+        await crud.update_password_hash(db, user.id, new_hash)
+        user.hashed_password = new_hash
     return user
 
 async def get_current_user(
         credentials: HTTPAuthorizationCredentials = Depends(security),
-        db: AsyncIOMotorDatabase = Depends(get_database)
+        db: AsyncDatabase = Depends(get_database)
 ) -> UserInDB:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -65,9 +111,16 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
 
+    # The token is still decoded above on every call, so expiry is always enforced
+    cache_key = blake2b(token.encode(), digest_size=16).digest()
+    cached = _user_cache.get(cache_key)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+
     user = await crud.get_user_by_email(db, email=token_data.email)
     if user is None:
         raise credentials_exception
+    _cache_user(cache_key, user)
     return user
 
 async def get_current_active_user(current_user: UserInDB = Depends(get_current_user)) -> UserInDB:
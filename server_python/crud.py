@@ -1,127 +1,147 @@
 # crud.py
-from motor.motor_asyncio import AsyncIOMotorDatabase
+import asyncio
+import re
+from pymongo.asynchronous.database import AsyncDatabase
 from models import UserCreate, UserUpdate, UserInDB, User, SignatureCreate, SignatureUpdate, SignatureInDB, Signature
-from passlib.context import CryptContext
 from bson import ObjectId
-from datetime import datetime
-from typing import Optional, List, Dict, Any
+from datetime import datetime, timezone
+from functools import lru_cache, partial
+from typing import Optional, List, Dict, Any, Tuple, Union
 import pymongo
+from pydantic import TypeAdapter
 
-from auth import get_password_hash
+from auth import get_password_hash_async, pwd_context
 
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Validators are built once at import instead of on every model construction.
+# Documents come back from Mongo with their BSON types intact, so they are
+# validated in strict mode and skip pydantic's coercion fallbacks.
+_USER_IN_DB = TypeAdapter(UserInDB)
+_USER = TypeAdapter(User)
+_SIG_IN_DB = TypeAdapter(SignatureInDB)
+_SIG = TypeAdapter(Signature)
+_USER_LIST = TypeAdapter(List[User])
+_SIG_LIST = TypeAdapter(List[Signature])
 
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+# Only fetch what the models actually read
+_USER_IN_DB_PROJECTION = dict.fromkeys(
+    ("email", "full_name", "is_active", "is_admin", "hashed_password", "created_at", "updated_at"), 1
+)
+_USER_PROJECTION = {"hashed_password": 0}
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
 
-# Add this function to the top of your crud.py file
-from bson import ObjectId
+# Timezone-aware replacement for the deprecated datetime.utcnow
+_utcnow = partial(datetime.now, timezone.utc)
+_pwd_hash = pwd_context.hash
+_pwd_verify = pwd_context.verify
 
-# Update your convert_objectids_to_strings function in crud.py
-from bson import ObjectId
 
-def convert_objectids_to_strings(doc):
-    """Convert ObjectId fields to strings for Pydantic compatibility"""
-    if not doc:
-        return doc
+@lru_cache(maxsize=4096)
+def _oid(value: str) -> Optional[ObjectId]:
+    """Parse a hex id once; hot ids (current user, polled documents) hit the cache"""
+    return ObjectId(value) if ObjectId.is_valid(value) else None
 
-    # Make a copy to avoid modifying original
-    result = {}
 
-    for key, value in doc.items():
-        if isinstance(value, ObjectId):
-            result[key] = str(value)
-        else:
-            result[key] = value
+def signer_email_prefix(signer_email: str) -> Dict[str, str]:
+    """Case-insensitive prefix match on the stored lowercase email; anchored so it can use the index"""
+    return {"$regex": f"^{re.escape(signer_email.lower())}"}
 
-    return result
 
+# Password hashing (shares auth.py's context so both accept the same schemes)
+def hash_password(password: str) -> str:
+    return _pwd_hash(password)
 
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return _pwd_verify(plain_password, hashed_password)
 
 
 # User CRUD operations
-async def create_user(db: AsyncIOMotorDatabase, user: UserCreate) -> UserInDB:
-    from auth import get_password_hash  # Make sure this import is at the top
-
-    hashed_password = get_password_hash(user.password)
-    user_dict = user.dict()
+async def create_user(db: AsyncDatabase, user: UserCreate) -> UserInDB:
+    hashed_password = await get_password_hash_async(user.password)  # Use auth.py function
+    user_dict = user.model_dump()
     user_dict.pop("password")
     user_dict["hashed_password"] = hashed_password
-    user_dict["created_at"] = datetime.utcnow()
+    user_dict["created_at"] = _utcnow()
 
-    result = await db.users.insert_one(user_dict)
-    created_user = await db.users.find_one({"_id": result.inserted_id})
+    # insert_one sets user_dict["_id"], so the stored document is already known
+    await db.users.insert_one(user_dict)
 
-    # Convert ObjectId to string
-    created_user = convert_objectids_to_strings(created_user)
-    return UserInDB(**created_user)
+    return _USER_IN_DB.validate_python(user_dict, strict=True)
 
-async def get_user_by_id(db: AsyncIOMotorDatabase, user_id: str) -> Optional[UserInDB]:
-    if not ObjectId.is_valid(user_id):
+async def get_user_by_id(db: AsyncDatabase, user_id: str) -> Optional[UserInDB]:
+    oid = _oid(user_id)
+    if oid is None:
         return None
-    user = await db.users.find_one({"_id": ObjectId(user_id)})
+    user = await db.users.find_one({"_id": oid})
     if user:
-        return UserInDB(**user)
+        return _USER_IN_DB.validate_python(user, strict=True)
     return None
 
-async def get_user_by_email(db: AsyncIOMotorDatabase, email: str) -> Optional[UserInDB]:
-    user = await db.users.find_one({"email": email})
+async def get_user_by_email(db: AsyncDatabase, email: str) -> Optional[UserInDB]:
+    user = await db.users.find_one({"email": email}, projection=_USER_IN_DB_PROJECTION)
     if user:
-        # Explicitly convert ObjectId to string
-        if "_id" in user:
-            user["_id"] = str(user["_id"])
-        if "user_id" in user and isinstance(user["user_id"], ObjectId):
-            user["user_id"] = str(user["user_id"])
-
-        return UserInDB(**user)
+        return _USER_IN_DB.validate_python(user, strict=True)
     return None
 
-async def get_users(db: AsyncIOMotorDatabase, skip: int = 0, limit: int = 100) -> List[User]:
-    cursor = db.users.find().skip(skip).limit(limit).sort("created_at", pymongo.DESCENDING)
-    users = []
-    async for user in cursor:
-        users.append(User(**user))
-    return users
-
-async def update_user(db: AsyncIOMotorDatabase, user_id: str, user_update: UserUpdate) -> Optional[User]:
-    if not ObjectId.is_valid(user_id):
+async def get_users(
+        db: AsyncDatabase, skip: int = 0, limit: int = 100, with_total: bool = False
+) -> Union[List[User], Tuple[List[User], int]]:
+    cursor = db.users.find(projection=_USER_PROJECTION).skip(skip).limit(limit).sort("created_at", pymongo.DESCENDING)
+    if with_total:
+        # Unfiltered, so the collection metadata count is enough; run it alongside the fetch
+        docs, total = await asyncio.gather(cursor.to_list(length=limit), db.users.estimated_document_count())
+        return _USER_LIST.validate_python(docs, strict=True), total
+    docs = await cursor.to_list(length=limit)
+    return _USER_LIST.validate_python(docs, strict=True)
+
+async def update_user(db: AsyncDatabase, user_id: str, user_update: UserUpdate) -> Optional[User]:
+    oid = _oid(user_id)
+    if oid is None:
         return None
 
-    update_data = {k: v for k, v in user_update.dict().items() if v is not None}
+    update_data = user_update.model_dump(exclude_unset=True, exclude_none=True)
     if update_data:
-        update_data["updated_at"] = datetime.utcnow()
-        await db.users.update_one(
-            {"_id": ObjectId(user_id)},
-            {"$set": update_data}
+        update_data["updated_at"] = _utcnow()
+        updated_user = await db.users.find_one_and_update(
+            {"_id": oid},
+            {"$set": update_data},
+            return_document=pymongo.ReturnDocument.AFTER
         )
-
-    updated_user = await db.users.find_one({"_id": ObjectId(user_id)})
+    else:
+        updated_user = await db.users.find_one({"_id": oid})
     if updated_user:
-        return User(**updated_user)
+        return _USER.validate_python(updated_user, strict=True)
     return None
 
-async def delete_user(db: AsyncIOMotorDatabase, user_id: str) -> bool:
-    if not ObjectId.is_valid(user_id):
+async def update_password_hash(db: AsyncDatabase, user_id: str, hashed_password: str) -> None:
+    oid = _oid(user_id)
+    if oid is None:
+        return
+    await db.users.update_one(
+        {"_id": oid},
+        {"$set": {"hashed_password": hashed_password, "updated_at": _utcnow()}}
+    )
+
+async def delete_user(db: AsyncDatabase, user_id: str) -> bool:
+    oid = _oid(user_id)
+    if oid is None:
         return False
 
-    result = await db.users.delete_one({"_id": ObjectId(user_id)})
+    result = await db.users.delete_one({"_id": oid})
     return result.deleted_count > 0
 
 # Signature CRUD operations
 # In crud.py, update functions like this:
 
-async def create_signature(db: AsyncIOMotorDatabase, signature: SignatureCreate) -> SignatureInDB:
-    signature_dict = signature.dict()
-    current_time = datetime.utcnow()
+async def create_signature(db: AsyncDatabase, signature: SignatureCreate) -> SignatureInDB:
+    signature_dict = signature.model_dump()
+    current_time = _utcnow()
     signature_dict["updated_at"] = current_time
+    signature_dict["signer_email_lc"] = signature_dict["signer_email"].lower()
 
     # Use upsert to prevent duplicates based on document_id, signer_email, user_id, and service
-    result = await db.signatures.update_one(
+    # and get the signature (either updated or newly created) back in the same round trip
+    created_signature = await db.signatures.find_one_and_update(
         {
             "document_id": signature_dict["document_id"],
             "signer_email": signature_dict["signer_email"],
@@ -132,124 +152,137 @@ async def create_signature(db: AsyncIOMotorDatabase, signature: SignatureCreate)
             "$set": signature_dict,
             "$setOnInsert": {"created_at": current_time}
         },
-        upsert=True
+        upsert=True,
+        return_document=pymongo.ReturnDocument.AFTER
     )
 
-    # Get the signature (either updated or newly created)
-    if result.upserted_id:
-        # New document was created
-        signature_id = result.upserted_id
-    else:
-        # Existing document was updated, find it by the filter criteria
-        existing_signature = await db.signatures.find_one({
-            "document_id": signature_dict["document_id"],
-            "signer_email": signature_dict["signer_email"],
-            "user_id": signature_dict["user_id"],
-            "service": signature_dict["service"]
-        })
-        signature_id = existing_signature["_id"]
+    return _SIG_IN_DB.validate_python(created_signature, strict=True)
+
 
-    # Retrieve the final signature
-    created_signature = await db.signatures.find_one({"_id": signature_id})
 
-    # Convert ObjectId to string
-    if created_signature:
-        created_signature = convert_objectids_to_strings(created_signature)
+async def create_signatures_bulk(db: AsyncDatabase, signatures: List[SignatureCreate]) -> int:
+    """Upsert many signatures in one round trip; returns the number of inserted or modified rows"""
+    if not signatures:
+        return 0
 
-    return SignatureInDB(**created_signature)
+    current_time = _utcnow()
+    ops = []
+    for signature in signatures:
+        signature_dict = signature.model_dump()
+        signature_dict["updated_at"] = current_time
+        signature_dict["signer_email_lc"] = signature_dict["signer_email"].lower()
+        ops.append(pymongo.UpdateOne(
+            {
+                "document_id": signature_dict["document_id"],
+                "signer_email": signature_dict["signer_email"],
+                "user_id": signature_dict["user_id"],
+                "service": signature_dict["service"]
+            },
+            {
+                "$set": signature_dict,
+                "$setOnInsert": {"created_at": current_time}
+            },
+            upsert=True
+        ))
+
+    result = await db.signatures.bulk_write(ops, ordered=False)
+    return result.upserted_count + result.modified_count
 
 
 
 # Apply similar fixes to other functions:
-async def get_signature_by_id(db: AsyncIOMotorDatabase, signature_id: str) -> Optional[Signature]:
-    if not ObjectId.is_valid(signature_id):
+async def get_signature_by_id(db: AsyncDatabase, signature_id: str) -> Optional[Signature]:
+    oid = _oid(signature_id)
+    if oid is None:
         return None
 
-    signature = await db.signatures.find_one({"_id": ObjectId(signature_id)})
+    signature = await db.signatures.find_one({"_id": oid})
     if signature:
-        # Convert ObjectIds to strings
-        signature["_id"] = str(signature["_id"])
-        if "user_id" in signature and isinstance(signature["user_id"], ObjectId):
-            signature["user_id"] = str(signature["user_id"])
-        return Signature(**signature)
+        return _SIG.validate_python(signature, strict=True)
     return None
 
 
 
-async def get_signatures_by_document(db: AsyncIOMotorDatabase, document_id: str) -> List[Signature]:
+async def get_signatures_by_document(db: AsyncDatabase, document_id: str) -> List[Signature]:
     cursor = db.signatures.find({"document_id": document_id}).sort("created_at", pymongo.DESCENDING)
-    signatures = []
-    async for signature in cursor:
-        signatures.append(Signature(**signature))
-    return signatures
+    docs = await cursor.to_list(length=None)
+    return _SIG_LIST.validate_python(docs, strict=True)
+
+async def get_signatures_by_documents(db: AsyncDatabase, document_ids: List[str]) -> List[Signature]:
+    cursor = db.signatures.find({"document_id": {"$in": document_ids}}).sort("created_at", pymongo.DESCENDING)
+    docs = await cursor.to_list(length=None)
+    return _SIG_LIST.validate_python(docs, strict=True)
 
-async def get_signatures_by_user(db: AsyncIOMotorDatabase, user_id: str) -> List[Signature]:
-    if not ObjectId.is_valid(user_id):
+async def get_signatures_by_user(db: AsyncDatabase, user_id: str) -> List[Signature]:
+    oid = _oid(user_id)
+    if oid is None:
         return []
 
-    cursor = db.signatures.find({"user_id": ObjectId(user_id)}).sort("created_at", pymongo.DESCENDING)
-    signatures = []
-    async for signature in cursor:
-        signatures.append(Signature(**signature))
-    return signatures
+    cursor = db.signatures.find({"user_id": oid}).sort("created_at", pymongo.DESCENDING)
+    docs = await cursor.to_list(length=None)
+    return _SIG_LIST.validate_python(docs, strict=True)
 
-async def get_signatures_by_request(db: AsyncIOMotorDatabase, signature_request_id: str) -> List[Signature]:
+async def get_signatures_by_request(db: AsyncDatabase, signature_request_id: str) -> List[Signature]:
     cursor = db.signatures.find({"signature_request_id": signature_request_id}).sort("created_at", pymongo.DESCENDING)
-    signatures = []
-    async for signature in cursor:
-        signatures.append(Signature(**signature))
-    return signatures
+    docs = await cursor.to_list(length=None)
+    return _SIG_LIST.validate_python(docs, strict=True)
 
-async def update_signature(db: AsyncIOMotorDatabase, signature_id: str, signature_update: SignatureUpdate) -> Optional[Signature]:
-    if not ObjectId.is_valid(signature_id):
+async def update_signature(db: AsyncDatabase, signature_id: str, signature_update: SignatureUpdate) -> Optional[Signature]:
+    oid = _oid(signature_id)
+    if oid is None:
         return None
 
-    update_data = {k: v for k, v in signature_update.dict().items() if v is not None}
+    update_data = signature_update.model_dump(exclude_unset=True, exclude_none=True)
     if update_data:
-        update_data["updated_at"] = datetime.utcnow()
-        await db.signatures.update_one(
-            {"_id": ObjectId(signature_id)},
-            {"$set": update_data}
+        update_data["updated_at"] = _utcnow()
+        updated_signature = await db.signatures.find_one_and_update(
+            {"_id": oid},
+            {"$set": update_data},
+            return_document=pymongo.ReturnDocument.AFTER
         )
-
-    updated_signature = await db.signatures.find_one({"_id": ObjectId(signature_id)})
+    else:
+        updated_signature = await db.signatures.find_one({"_id": oid})
     if updated_signature:
-        return Signature(**updated_signature)
+        return _SIG.validate_python(updated_signature, strict=True)
     return None
 
 async def search_signatures(
-        db: AsyncIOMotorDatabase,
+        db: AsyncDatabase,
         user_id: Optional[str] = None,
         service: Optional[str] = None,
         status: Optional[str] = None,
         signer_email: Optional[str] = None,
         skip: int = 0,
-        limit: int = 100
-) -> List[Signature]:
+        limit: int = 100,
+        with_total: bool = False
+) -> Union[List[Signature], Tuple[List[Signature], int]]:
     query = {}
 
-    if user_id and ObjectId.is_valid(user_id):
-        query["user_id"] = ObjectId(user_id)
+    if user_id and (oid := _oid(user_id)) is not None:
+        query["user_id"] = oid
     if service:
         query["service"] = service
     if status:
         query["status"] = status
     if signer_email:
-        query["signer_email"] = {"$regex": signer_email, "$options": "i"}
+        query["signer_email_lc"] = signer_email_prefix(signer_email)
 
     cursor = db.signatures.find(query).skip(skip).limit(limit).sort("created_at", pymongo.DESCENDING)
-    signatures = []
-    async for signature in cursor:
-        signatures.append(Signature(**signature))
-    return signatures
+    if with_total:
+        count = db.signatures.count_documents(query) if query else db.signatures.estimated_document_count()
+        docs, total = await asyncio.gather(cursor.to_list(length=limit), count)
+        return _SIG_LIST.validate_python(docs, strict=True), total
+    docs = await cursor.to_list(length=limit)
+    return _SIG_LIST.validate_python(docs, strict=True)
 
 # Advanced queries using MongoDB aggregation
-async def get_user_with_signatures(db: AsyncIOMotorDatabase, user_id: str) -> Optional[Dict[str, Any]]:
-    if not ObjectId.is_valid(user_id):
+async def get_user_with_signatures(db: AsyncDatabase, user_id: str) -> Optional[Dict[str, Any]]:
+    oid = _oid(user_id)
+    if oid is None:
         return None
 
     pipeline = [
-        {"$match": {"_id": ObjectId(user_id)}},
+        {"$match": {"_id": oid}},
         {
             "$lookup": {
                 "from": "signatures",
@@ -257,14 +290,15 @@ async def get_user_with_signatures(db: AsyncIOMotorDatabase, user_id: str) -> Op
                 "foreignField": "user_id",
                 "as": "signatures"
             }
-        }
+        },
+        {"$project": {"hashed_password": 0}}
     ]
 
-    async for result in db.users.aggregate(pipeline):
-        return result
-    return None
+    cursor = await db.users.aggregate(pipeline)
+    docs = await cursor.to_list(length=1)
+    return docs[0] if docs else None
 
-async def get_signature_stats(db: AsyncIOMotorDatabase) -> Dict[str, Any]:
+async def get_signature_stats(db: AsyncDatabase) -> Dict[str, Any]:
     pipeline = [
         {
             "$group": {
@@ -274,23 +308,6 @@ async def get_signature_stats(db: AsyncIOMotorDatabase) -> Dict[str, Any]:
         }
     ]
 
-    stats = {}
-    async for result in db.signatures.aggregate(pipeline):
-        stats[result["_id"]] = result["count"]
-
-    return stats
-
-
-async def create_user(db: AsyncIOMotorDatabase, user: UserCreate) -> UserInDB:
-    hashed_password = get_password_hash(user.password)  # Use auth.py function
-    user_dict = user.dict()
-    user_dict.pop("password")
-    user_dict["hashed_password"] = hashed_password
-    user_dict["created_at"] = datetime.utcnow()
-
-    result = await db.users.insert_one(user_dict)
-    created_user = await db.users.find_one({"_id": result.inserted_id})
-
-    # Convert ObjectId to string
-    created_user = convert_objectids_to_strings(created_user)
-    return UserInDB(**created_user)
+    cursor = await db.signatures.aggregate(pipeline)
+    rows = await cursor.to_list(length=None)
+    return {r["_id"]: r["count"] for r in rows}
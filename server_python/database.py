@@ -1,25 +1,46 @@
 # database.py
-from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo import IndexModel, ASCENDING
+from pymongo import AsyncMongoClient, IndexModel, ASCENDING, DESCENDING
+from pymongo.errors import DuplicateKeyError, OperationFailure
+import logging
 import os
 from typing import Optional
 
 class MongoDB:
-    client: Optional[AsyncIOMotorClient] = None
+    client: Optional[AsyncMongoClient] = None
     database = None
 
 # MongoDB connection
 mongodb_client = MongoDB()
 
+logger = logging.getLogger(__name__)
+
 # MongoDB connection string - adjust as needed
 MONGODB_URL = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
 DATABASE_NAME = os.getenv("DATABASE_NAME", "document_signing")
+MONGODB_MAX_POOL_SIZE = int(os.getenv("MONGODB_MAX_POOL_SIZE", "50"))
+MONGODB_MIN_POOL_SIZE = int(os.getenv("MONGODB_MIN_POOL_SIZE", "10"))
+# Wire compression trades a little CPU for much less traffic on large documents.
+# zlib ships with Python; zstd/snappy need the zstandard/python-snappy packages.
+MONGODB_COMPRESSORS = os.getenv("MONGODB_COMPRESSORS", "zlib")
 
 async def connect_to_mongo():
     """Create database connection"""
-    mongodb_client.client = AsyncIOMotorClient(MONGODB_URL)
+    mongodb_client.client = AsyncMongoClient(
+        MONGODB_URL,
+        maxPoolSize=MONGODB_MAX_POOL_SIZE,
+        minPoolSize=MONGODB_MIN_POOL_SIZE,
+        serverSelectionTimeoutMS=3000,
+        waitQueueTimeoutMS=2000,
+        compressors=MONGODB_COMPRESSORS,
+        zlibCompressionLevel=3,
+        retryWrites=True,
+        appname="doc-signing"
+    )
     mongodb_client.database = mongodb_client.client[DATABASE_NAME]
 
+    # Force the handshake now so the first request doesn't pay for it
+    await mongodb_client.client.admin.command("ping")
+
     # Create indexes for better performance
     await create_indexes()
     print(f"Connected to MongoDB at {MONGODB_URL}")
@@ -27,7 +48,7 @@ async def connect_to_mongo():
 async def close_mongo_connection():
     """Close database connection"""
     if mongodb_client.client:
-        mongodb_client.client.close()
+        await mongodb_client.client.close()
         print("Disconnected from MongoDB")
 
 async def create_indexes():
@@ -39,14 +60,63 @@ async def create_indexes():
     await users_collection.create_index([("email", ASCENDING)], unique=True)
     await users_collection.create_index([("created_at", ASCENDING)])
 
-    # Signature indexes
-    await signatures_collection.create_index([("document_id", ASCENDING)])
+    # Signature indexes from earlier versions; the compound indexes below cover their queries,
+    # and every write would otherwise keep maintaining them. status_open was a partial index
+    # whose $in filter needs MongoDB 6.0+; the plain status index replaces it
+    for name in ("document_id_1", "user_id_1", "signer_email_1", "service_1", "status_open"):
+        try:
+            await signatures_collection.drop_index(name)
+        except OperationFailure as e:
+            if e.code != 27:  # IndexNotFound: fresh database or already dropped
+                raise
+
+    # Signature indexes, shaped after the lookups and their created_at sort
+    await signatures_collection.create_index([("document_id", ASCENDING), ("created_at", DESCENDING)])
+    await signatures_collection.create_index([("user_id", ASCENDING), ("created_at", DESCENDING)])
     await signatures_collection.create_index([("signature_request_id", ASCENDING)])
-    await signatures_collection.create_index([("user_id", ASCENDING)])
-    await signatures_collection.create_index([("signer_email", ASCENDING)])
-    await signatures_collection.create_index([("service", ASCENDING)])
-    await signatures_collection.create_index([("status", ASCENDING)])
+    # Document status refresh updates every signature of a document for one user and service
+    await signatures_collection.create_index(
+        [("document_id", ASCENDING), ("user_id", ASCENDING), ("service", ASCENDING)],
+        name="doc_user_service"
+    )
+    # search_signatures filters by user and status together
+    await signatures_collection.create_index([("user_id", ASCENDING), ("status", ASCENDING)])
     await signatures_collection.create_index([("created_at", ASCENDING)])
+    # Backs the create_signature upsert filter and makes duplicate prevention race-free.
+    # Existing duplicate rows make the build fail; start anyway (the upsert still dedupes
+    # non-concurrent writes) and say how to fix it rather than refusing to boot
+    try:
+        await signatures_collection.create_index(
+            [("document_id", ASCENDING), ("signer_email", ASCENDING), ("user_id", ASCENDING), ("service", ASCENDING)],
+            unique=True
+        )
+    except DuplicateKeyError as e:
+        logger.error(
+            "Unique signature index not created: the signatures collection has duplicate "
+            "(document_id, signer_email, user_id, service) rows. Remove the duplicates and restart. "
+            "Details: %s", e
+        )
+    # Lowercased copy of signer_email for indexed case-insensitive search
+    await signatures_collection.create_index([("signer_email_lc", ASCENDING)])
+    await _backfill_signer_email_lc(mongodb_client.database)
+    # Status searches aren't limited to unfinished signatures (sent/signed too), so keep a full index
+    await signatures_collection.create_index([("status", ASCENDING)])
+
+async def _backfill_signer_email_lc(db):
+    """One-off: fill signer_email_lc on signatures written before the field existed
+
+    Every write path sets the field now, so this only has to run once per database;
+    a marker in the migrations collection keeps later startups from scanning signatures.
+    """
+    marker = {"_id": "signer_email_lc_backfill"}
+    if await db.migrations.find_one(marker):
+        return
+    result = await db.signatures.update_many(
+        {"signer_email_lc": {"$exists": False}},
+        [{"$set": {"signer_email_lc": {"$toLower": "$signer_email"}}}]
+    )
+    await db.migrations.update_one(marker, {"$setOnInsert": marker}, upsert=True)
+    logger.info("Backfilled signer_email_lc on %d signatures", result.modified_count)
 
 def get_database():
     """Get database instance"""
@@ -1,7 +1,8 @@
 # docusign_service.py
-import base64, logging, os, jwt, requests, traceback
-from typing import List, Dict, Any, Optional
-from datetime import datetime, timedelta
+import asyncio, base64, concurrent.futures, json, logging, os, requests, threading, time
+from typing import List, Dict, Any, Iterator, Optional
+from datetime import date, timedelta
+from functools import lru_cache
 
 # DocuSign Python SDK imports
 from docusign_esign import ApiClient, Configuration, CustomFields, EnvelopesApi, ListCustomField, TextCustomField
@@ -10,11 +11,44 @@ from docusign_esign.models import (
     Recipients, EnvelopeSummary, RecipientViewRequest, ViewUrl, Envelope
 )
 from docusign_esign.client.api_exception import ApiException
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import padding
+
+from docusign_oauth import TOKEN_TIMEOUT, token_session
 
 
 
 logger = logging.getLogger(__name__)
 
+def _b64url(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+# The JWT header never changes, so neither does its encoding
+_JWT_HEADER_B64 = _b64url(b'{"alg":"RS256","typ":"JWT"}')
+
+@lru_cache(maxsize=1)
+def _search_from_date(today: date) -> str:
+    """Start of the 30 day search window; recomputed only when the day changes"""
+    return (today - timedelta(days=30)).strftime('%Y-%m-%d')
+
+
+# Rate limiting and transient server errors are worth another attempt
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+def _call_with_retry(fn, *args, attempts=4, backoff=0.3, max_wait=5.0, retry_statuses=RETRY_STATUSES, **kwargs):
+    """Call a DocuSign SDK method, retrying retryable API errors with capped exponential backoff"""
+    for attempt in range(attempts):
+        try:
+            return fn(*args, **kwargs)
+        except ApiException as e:
+            if e.status not in retry_statuses or attempt == attempts - 1:
+                raise
+            delay = min(backoff * 2 ** attempt, max_wait)
+            logger.warning("DocuSign %s returned %s, retrying in %.1fs", fn.__name__, e.status, delay)
+            time.sleep(delay)
+
 class DocuSignService:
     def __init__(self, docusign_oauth):
 
@@ -29,9 +63,19 @@ class DocuSignService:
 
         self.access_token = None
         self.token_expires_at = None
+        # Serializes token refreshes so concurrent requests don't all hit the token endpoint
+        self._token_lock = threading.Lock()
+
+        # One ApiClient for the life of the service; only its Authorization header changes
+        self._api_client = ApiClient()
+        self._api_client.host = self.base_path
+        self._envelopes_api = EnvelopesApi(self._api_client)
+        # Plain pooled session for the endpoints we call without the SDK (streamed downloads)
+        self._session = requests.Session()
 
-        # Private key file path
+        # Private key file path; parsed on first use and kept for later JWT grants
         self.private_key_path = "keys/private_key.txt"
+        self._rsa_private_key = None
 
     def initiate_signing_process(self, document_content, signers, metadata):
         """
@@ -46,14 +90,12 @@ class DocuSignService:
             Dict with envelope_id and signing URLs
         """
         try:
-            logger.info("Initating api client")
             # Setup API client
-            api_client = self._get_api_client()
+            envelopes_api = self._get_envelopes_api()
 
-            logger.info("Creating document")
             # Create document
             document = Document(
-                document_base64=base64.b64encode(document_content).decode('utf-8'),
+                document_base64=base64.b64encode(document_content).decode('ascii'),
                 name="Document to Sign",
                 file_extension="pdf",
                 document_id="1"
@@ -61,26 +103,19 @@ class DocuSignService:
 
             # Create signers
             envelope_signers = []
-            signing_urls = []
-
-            logger.info("Creating signers")
 
             for i, signer_info in enumerate(signers, 1):
-                logger.info(signer_info)
-                signer_email = signer_info.signer_email
-                logger.info("email:" + signer_email)
-                signer_name = signer_info.signer_name
-                mode = signer_info.mode
+                logger.debug("Creating signer %s", signer_info)
+                signer_email = signer_info["signer_email"]
+                signer_name = signer_info["signer_name"]
                 recipient_id = str(i)
 
-                logger.info("Creating Signer:" + signer_name)
                 # Create signer
                 signer = Signer(
                     email=signer_email,
                     name=signer_name,
                     recipient_id=recipient_id
                 )
-                logger.info("Signer created")
 
                 # Add signature tab
                 sign_here = SignHere(
@@ -96,96 +131,54 @@ class DocuSignService:
                 signer.tabs = tabs
                 envelope_signers.append(signer)
 
-            text_custom_fields = []
-            list_custom_fields = []
-
-            if metadata:
-                for key, value in metadata.items():
-                    if isinstance(value, list):
-                        # For dropdown/list values
-                        list_field = ListCustomField(
-                            name=key,
-                            value=value[0] if value else "",
-                            list_items=value,
-                            show="true",
-                            required="false"
-                        )
-                        list_custom_fields.append(list_field)
-                    else:
-                        # For text values
-                        text_field = TextCustomField(
-                            name=key,
-                            value=str(value),
-                            show="true",
-                            required="false"
-                        )
-                        text_custom_fields.append(text_field)
-
             # Create envelope definition
             envelope_definition = EnvelopeDefinition(
                 email_subject="Please sign this document",
                 documents=[document],
                 recipients=Recipients(signers=envelope_signers),
-                custom_fields=CustomFields(
-                    text_custom_fields=text_custom_fields,
-                    list_custom_fields=list_custom_fields
-                ) if (text_custom_fields or list_custom_fields) else None,
+                custom_fields=self._custom_fields(metadata) if metadata else None,
                 status="sent"
             )
 
-            logger.info("Creating envelope")
             # Create envelope
-            envelopes_api = EnvelopesApi(api_client)
-            envelope_summary = envelopes_api.create_envelope(
+            # Creation isn't idempotent: only retry rate limiting, where nothing was created
+            envelope_summary = _call_with_retry(
+                envelopes_api.create_envelope,
                 self.account_id,
+                retry_statuses=frozenset({429}),
                 envelope_definition=envelope_definition
             )
 
             envelope_id = envelope_summary.envelope_id
 
-            logger.info("Evenlope create with id:" + envelope_id)
+            logger.info("Envelope created with id: %s", envelope_id)
 
-            # Handle different signing modes for each signer
+            # Handle different signing modes for each signer, keeping the signers' order
+            signing_urls = [None] * len(signers)
+            direct_signers = []
             for i, signer_info in enumerate(signers, 1):
-                mode = signer_info.mode
-                recipient_id = str(i)
-
-                if mode == 'EMAIL_NOTIFICATION':
-                    # For email mode, we'll send the envelope after all signers are processed
-                    logger.info("Appending url")
-                    signing_urls.append({
-                        "signer_email": signer_info.signer_email,
-                        "signer_name": signer_info.signer_name,
+                if signer_info["mode"] == 'EMAIL_NOTIFICATION':
+                    # For email mode there is no view to create
+                    signing_urls[i - 1] = {
+                        "signer_email": signer_info["signer_email"],
+                        "signer_name": signer_info["signer_name"],
                         "signing_url": None,  # No direct URL for email mode
-                        "mode": mode
-                    })
-                    logger.info("Url appended")
+                        "mode": signer_info["mode"]
+                    }
                 else:  # DIRECT_SIGNING mode
-                    # Create recipient view for embedded signing
-                    view_request = RecipientViewRequest(
-                        return_url="https://your-app.com/signing-complete",
-                        authentication_method="none",
-                        email=signer_info.signer_email,
-                        user_name=signer_info.signer_name,
-                        recipient_id=recipient_id
-                    )
-
-                    logger.info("Creating view")
-                    recipient_view = envelopes_api.create_recipient_view(
-                        self.account_id,
-                        envelope_id=envelope_id,
-                        recipient_view_request=view_request
-                    )
-                    logger.info("View created with url: " + recipient_view.url)
-
-                    signing_urls.append({
-                        "signer_email": signer_info.signer_email,
-                        "signer_name": signer_info.signer_name,
-                        "signing_url": recipient_view.url,
-                        "mode": mode
-                    })
-
-            logger.info("Finished init process for Docusign")
+                    direct_signers.append((i, signer_info))
+
+            # One HTTPS round trip per embedded signer; run them side by side
+            if direct_signers:
+                with concurrent.futures.ThreadPoolExecutor(max_workers=min(8, len(direct_signers))) as pool:
+                    futures = {
+                        i: pool.submit(self._create_recipient_view, envelopes_api, envelope_id, signer_info, i)
+                        for i, signer_info in direct_signers
+                    }
+                    for i, future in futures.items():
+                        signing_urls[i - 1] = future.result()
+
+            logger.debug("Finished init process for Docusign")
 
             return {
                 "document_id": envelope_id,
@@ -194,13 +187,64 @@ class DocuSignService:
             }
 
         except ApiException as e:
-            logger.error(f"DocuSign API error: {e}")
-            print(traceback.format_exc())
+            logger.exception("DocuSign API error")
             raise Exception(f"Failed to create DocuSign envelope: {e}")
         except Exception as e:
             logger.error(f"Error initiating DocuSign signing process: {e}")
             raise
 
+    @staticmethod
+    def _custom_fields(metadata):
+        """Envelope custom fields for non-empty metadata: lists become dropdowns, everything else text"""
+        return CustomFields(
+            # For dropdown/list values
+            list_custom_fields=[
+                ListCustomField(
+                    name=key,
+                    value=value[0] if value else "",
+                    list_items=value,
+                    show="true",
+                    required="false"
+                )
+                for key, value in metadata.items() if isinstance(value, list)
+            ],
+            # For text values
+            text_custom_fields=[
+                TextCustomField(
+                    name=key,
+                    value=str(value),
+                    show="true",
+                    required="false"
+                )
+                for key, value in metadata.items() if not isinstance(value, list)
+            ]
+        )
+
+    def _create_recipient_view(self, envelopes_api, envelope_id, signer_info, recipient_index):
+        """Create the embedded signing view for one DIRECT_SIGNING signer"""
+        view_request = RecipientViewRequest(
+            return_url="https://your-app.com/signing-complete",
+            authentication_method="none",
+            email=signer_info["signer_email"],
+            user_name=signer_info["signer_name"],
+            recipient_id=str(recipient_index)
+        )
+
+        recipient_view = _call_with_retry(
+            envelopes_api.create_recipient_view,
+            self.account_id,
+            envelope_id=envelope_id,
+            recipient_view_request=view_request
+        )
+        logger.debug("View created for recipient %d", recipient_index)
+
+        return {
+            "signer_email": signer_info["signer_email"],
+            "signer_name": signer_info["signer_name"],
+            "signing_url": recipient_view.url,
+            "mode": signer_info["mode"]
+        }
+
     def get_signing_status(self, envelope_id: str) -> Dict[str, Any]:
         """
         Get the signing status of an envelope
@@ -212,34 +256,31 @@ class DocuSignService:
             Dict with status information
         """
         try:
-            logger.info("Get status!!!!!!!!!!!!!!!!!!!!")
-            api_client = self._get_api_client()
+            envelopes_api = self._get_envelopes_api()
 
-            logger.info("Getting the api client")
-            envelopes_api = EnvelopesApi(api_client)
-
-            logger.info("Checking envelopes api")
             # Get envelope information
-            envelope = envelopes_api.get_envelope(self.account_id, envelope_id)
+            envelope = _call_with_retry(envelopes_api.get_envelope, self.account_id, envelope_id)
 
-            logger.info("Got envelope:" + str(envelope))
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Got envelope: %s", envelope)
 
             # Get recipients information for detailed status
-            recipients = envelopes_api.list_recipients(self.account_id, envelope_id)
+            recipients = _call_with_retry(envelopes_api.list_recipients, self.account_id, envelope_id)
 
-            logger.info("Got Recepients:" + str(recipients))
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Got recipients: %s", recipients)
 
             # Process signer information
-            signers_status = []
-            for signer in recipients.signers or []:
-                logger.info("signer:" + str(signer.email))
-                signers_status.append({
+            signers_status = [
+                {
                     "email": signer.email,
                     "name": signer.name,
                     "signed": signer.status == "completed",
                     "signed_at": signer.signed_date_time,
                     "status": signer.status
-                })
+                }
+                for signer in recipients.signers or []
+            ]
 
             return {
                 "document_id": envelope_id,
@@ -253,61 +294,67 @@ class DocuSignService:
             logger.error(f"Error getting DocuSign envelope status: {e}")
             raise Exception(f"Failed to get envelope status: {e}")
 
-    def get_signed_document(self, envelope_id: str) -> bytes:
-        try:
-            # Debug: Log the envelope ID
-            logger.info(f"Attempting to download document for envelope: {envelope_id}")
-            logger.info(f"Envelope ID length: {len(envelope_id)}")
-            logger.info(f"Envelope ID format valid: {len(envelope_id) == 36 and envelope_id.count('-') == 4}")
+    def stream_signed_document(self, envelope_id: str, verify_status: bool = True,
+                               chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        """
+        Stream the combined signed document instead of loading it into memory
 
-            api_client = self._get_api_client()
-            envelopes_api = EnvelopesApi(api_client)
+        The SDK's get_document buffers the whole PDF, so this calls the REST endpoint
+        directly. Errors are raised before the first chunk is returned, so callers can
+        still turn them into an error response.
 
-            # First check if envelope exists
-            envelope = envelopes_api.get_envelope(self.account_id, envelope_id)
-            logger.info(f"Envelope status: {envelope.status}")
+        Args:
+            envelope_id: The DocuSign envelope ID
+            verify_status: Check that the envelope is completed first
+            chunk_size: Bytes per yielded chunk
 
-            # Only download if envelope is completed
+        Returns:
+            Iterator over the PDF bytes
+        """
+        envelopes_api = self._get_envelopes_api()
+
+        if verify_status:
+            envelope = _call_with_retry(envelopes_api.get_envelope, self.account_id, envelope_id)
             if envelope.status != "completed":
                 raise Exception(f"Cannot download document. Envelope status is: {envelope.status}")
 
-            logger.info(f"Account ID: {self.account_id}")
-            logger.info(f"Envelope ID for download: '{envelope_id}'")
-            logger.info(f"Document ID: 'combined'")
-
-            # Method 1: Get documents list first, then download specific document
-            documents = envelopes_api.list_documents(self.account_id, envelope_id)
-            logger.info(f"Available documents: {[doc.document_id for doc in documents.envelope_documents]}")
-
-            document_bytes = envelopes_api.get_document(
-                self.account_id,
-                "combined",
-                envelope_id
-            )
-
-            return document_bytes
+        url = f"{self.base_path}/v2.1/accounts/{self.account_id}/envelopes/{envelope_id}/documents/combined"
+        response = self._session.get(
+            url,
+            headers={"Authorization": f"Bearer {self.access_token}", "Accept": "application/pdf"},
+            stream=True,
+            timeout=(3.05, 60)
+        )
+        if response.status_code != 200:
+            response.close()
+            raise Exception(f"Failed to download signed document: {response.status_code} - {response.text}")
 
-        except ApiException as e:
-            logger.error(f"DocuSign API error: {e}")
-            logger.error(f"Response body: {e.body if hasattr(e, 'body') else 'No body'}")
-
-            raise Exception(f"Failed to download signed document: {e}")
+        return self._iter_response(response, chunk_size)
 
+    @staticmethod
+    def _iter_response(response, chunk_size):
+        with response:
+            yield from response.iter_content(chunk_size=chunk_size)
 
     async def search_documents(self, search_params, limit, offset):
         """Search DocuSign envelopes"""
+        # The SDK is blocking; run it on a worker thread so the event loop stays free
+        return await asyncio.to_thread(self._search_documents, search_params, limit, offset)
+
+    def _search_documents(self, search_params, limit, offset):
         try:
-            api_client = self._get_api_client()
-            envelopes_api = EnvelopesApi(api_client)
+            envelopes_api = self._get_envelopes_api()
 
             # Build parameters directly (no options class needed)
-            from_date = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
+            from_date = _search_from_date(date.today())
 
             # Build parameters - only include status if it has a value
             params = {
                 'count': str(min(limit, 100)),
                 'start_position': str(offset),
-                'from_date': from_date
+                'from_date': from_date,
+                # Return custom fields inline instead of one get_envelope per result
+                'include': 'custom_fields'
             }
 
             # Only add status if provided and not None
@@ -322,78 +369,65 @@ class DocuSignService:
                 params['status'] = mapped_status
 
             # Call with unpacked parameters
-            envelopes_result = envelopes_api.list_status_changes(
+            envelopes_result = _call_with_retry(
+                envelopes_api.list_status_changes,
                 self.account_id,
                 **params
             )
 
 
-            results = []
-
             # Process envelopes
-            for envelope in envelopes_result.envelopes or []:
-                # Get detailed envelope info including custom fields
-                envelope_details = envelopes_api.get_envelope(
-                    self.account_id,
-                    envelope.envelope_id,
-                    include="custom_fields"
-                )
-
-                document_info = {
-                    'document_id': envelope.envelope_id,
-                    'title': envelope.email_subject or 'Untitled',
-                    'status': envelope.status,
-                    'created_at': envelope.created_date_time,
-                    'modified_at': envelope.status_changed_date_time,
-                    'service': 'docusign',
-                    'metadata': {}
-                }
+            documents = (self._document_info(envelope) for envelope in envelopes_result.envelopes or [])
 
-                # Extract custom fields as metadata
-                if envelope_details.custom_fields:
-                    if envelope_details.custom_fields.text_custom_fields:
-                        for field in envelope_details.custom_fields.text_custom_fields:
-                            document_info['metadata'][field.name] = field.value
-
-                # Filter by metadata
-                matches = True
-                for param_key, param_value in search_params.items():
-                    if param_key == 'status':
-                        continue
-                    elif param_key == 'title':
-                        if param_value.lower() not in document_info['title'].lower():
-                            matches = False
-                            break
-                    else:
-                        doc_value = document_info['metadata'].get(param_key, '').lower()
-                        if param_value.lower() not in doc_value:
-                            matches = False
-                            break
-
-                if matches:
-                    results.append(document_info)
-
-            return results
+            # Lowercase the filter values once per search rather than once per envelope
+            filters = {k: v.lower() for k, v in search_params.items() if k != 'status'}
+            if not filters:
+                return list(documents)
+            return [info for info in documents if self._matches(info, filters)]
 
         except Exception as e:
-            logger.error(f"DocuSign search error: {e}")
-            print(traceback.format_exc())
+            logger.exception("DocuSign search error")
             raise Exception(f"Failed to search DocuSign documents: {e}")
 
 
 
-    def _get_access_token(self):
-        # Force UTC and add debugging
-        utc_now = datetime.utcnow()
-        current_time = int(utc_now.timestamp())
+    @staticmethod
+    def _document_info(envelope):
+        """Map an envelope from the status listing to a search result"""
+        custom_fields = envelope.custom_fields
+        text_fields = (custom_fields.text_custom_fields if custom_fields else None) or []
 
-        # Log the actual datetime for debugging
-        logger.info(f"Current UTC datetime: {utc_now}")
-        logger.info(f"Current timestamp: {current_time}")
+        return {
+            'document_id': envelope.envelope_id,
+            'title': envelope.email_subject or 'Untitled',
+            'status': envelope.status,
+            'created_at': envelope.created_date_time,
+            'modified_at': envelope.status_changed_date_time,
+            'service': 'docusign',
+            # Extract custom fields as metadata
+            'metadata': {field.name: field.value for field in text_fields}
+        }
 
-        # Use current time minus 5 minutes for clock skew
-        issued_at = current_time - 300 + 7200
-        expiry_time = current_time + 3600 + 7200
+    @staticmethod
+    def _matches(document_info, filters):
+        """Filter by title and metadata; filters are already lowercased"""
+        metadata = document_info['metadata']
+        for param_key, param_value in filters.items():
+            if param_key == 'title':
+                doc_value = document_info['title']
+            else:
+                doc_value = metadata.get(param_key) or ''
+            if param_value not in doc_value.lower():
+                return False
+        return True
+
+    def _get_access_token(self):
+        # Unix seconds are already UTC
+        current_time = int(time.time())
+
+        # Backdate slightly for clock skew
+        issued_at = current_time - 10
+        expiry_time = current_time + 3600
 
         payload = {
             "iss": self.integration_key,
@@ -404,22 +438,14 @@ class DocuSignService:
             "scope": "signature impersonation"
         }
 
-        # Convert timestamps back to readable dates for verification
-        logger.info(f"JWT issued at: {datetime.fromtimestamp(issued_at)} UTC")
-        logger.info(f"JWT expires at: {datetime.fromtimestamp(expiry_time)} UTC")
-
-
         try:
             private_key = self._load_private_key()
 
-            # Debug: Print the JWT payload
-            logger.info(f"JWT payload: {payload}")
-            logger.info(f"Integration Key: {self.integration_key}")
-            logger.info(f"User ID: {self.user_id}")
-            logger.info(f"Auth Server: {self.auth_server}")
-
-            jwt_token = jwt.encode(payload, private_key, algorithm='RS256')
-            logger.info(f"Generated JWT token (first 50 chars): {jwt_token[:50]}...")
+            # Never log the claims, assertion or token: they are credentials
+            # RS256 by hand: precomputed header, compact claims, signed with the cached key
+            signing_input = _JWT_HEADER_B64 + b"." + _b64url(json.dumps(payload, separators=(",", ":")).encode())
+            signature = private_key.sign(signing_input, padding.PKCS1v15(), hashes.SHA256())
+            jwt_token = (signing_input + b"." + _b64url(signature)).decode("ascii")
 
             url = f"https://{self.auth_server}/oauth/token"
             data = {
@@ -431,16 +457,14 @@ class DocuSignService:
                 "Content-Type": "application/x-www-form-urlencoded"
             }
 
-            logger.info(f"Making request to: {url}")
-            response = requests.post(url, data=data, headers=headers)
-
-            logger.info(f"Response status: {response.status_code}")
-            logger.info(f"Response body: {response.text}")
+            response = token_session.post(url, data=data, headers=headers, timeout=TOKEN_TIMEOUT)
+            logger.debug("Token endpoint %s returned %s", url, response.status_code)
 
             if response.status_code == 200:
                 token_data = response.json()
                 self.access_token = token_data.get('access_token')
-                self.token_expires_at = current_time + token_data.get('expires_in', 3600)
+                # Refresh 5 minutes early so a token never expires mid-request
+                self.token_expires_at = time.time() + token_data.get('expires_in', 3600) - 300
                 logger.info("Successfully obtained DocuSign access token")
                 return self.access_token
             else:
@@ -453,7 +477,10 @@ class DocuSignService:
 
 
     def _load_private_key(self):
-        """Load the RSA private key from keys/private_key.txt"""
+        """Load the RSA private key from keys/private_key.txt, parsed once and cached"""
+        if self._rsa_private_key is not None:
+            return self._rsa_private_key
+
         try:
             if not os.path.exists(self.private_key_path):
                 raise FileNotFoundError(f"Private key file not found: {self.private_key_path}")
@@ -465,24 +492,37 @@ class DocuSignService:
             if not private_key_content.startswith('-----BEGIN'):
                 raise ValueError("Invalid private key format. Expected PEM format starting with -----BEGIN")
 
-            logger.info(f"Successfully loaded private key from {self.private_key_path}")
-            return private_key_content
+            # Keep the parsed key object so each JWT grant signs without re-parsing the PEM
+            self._rsa_private_key = serialization.load_pem_private_key(private_key_content.encode(), password=None)
+
+            logger.info("Successfully loaded private key from %s", self.private_key_path)
+            return self._rsa_private_key
 
         except Exception as e:
             logger.error(f"Error loading private key: {e}")
             raise Exception(f"Failed to load private key from {self.private_key_path}: {e}")
 
 
+    def _token_valid(self):
+        return self.access_token is not None and self.token_expires_at is not None and time.time() < self.token_expires_at
+
     def _get_api_client(self):
-        """Setup and return configured API client"""
-        api_client = ApiClient()
-        api_client.host = self.base_path
-        if not self.access_token:
-            self.access_token = self._get_access_token()
+        """Return the shared API client, refreshing its access token when it is about to expire"""
+        if self._token_valid():
+            return self._api_client
+
+        with self._token_lock:
+            # Another thread may have refreshed while we waited for the lock
+            if not self._token_valid():
+                self._get_access_token()
+                self._api_client.set_default_header("Authorization", f"Bearer {self.access_token}")
 
-        api_client.set_default_header("Authorization", f"Bearer {self.access_token}")
+        return self._api_client
 
-        return api_client
+    def _get_envelopes_api(self):
+        """Return the shared EnvelopesApi with a fresh token on its client"""
+        self._get_api_client()
+        return self._envelopes_api
 
     def _get_access_token_oauth(self):
         """
@@ -518,6 +558,6 @@ if __name__ == "__main__":
 
     # Download when complete
     if status['signed']:
-        signed_doc = service.get_signed_document(result['document_id'])
         with open("signed_document.pdf", "wb") as f:
-            f.write(signed_doc)
+            for chunk in service.stream_signed_document(result['document_id']):
+                f.write(chunk)
@@ -1,10 +1,28 @@
 # docusign_oauth.py
-import base64, logging, os, requests, time
-from urllib.parse import urlencode, parse_qs, urlparse
+import base64, logging, os, requests, threading, time
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlencode, parse_qs, quote, urlparse
+from urllib3.util.retry import Retry
 from typing import Dict, Optional
 
 logger = logging.getLogger(__name__)
 
+# Timeout for token endpoint calls: (connect, read)
+TOKEN_TIMEOUT = (3.05, 10)
+
+
+def _build_token_session() -> requests.Session:
+    """Pooled session for the DocuSign token endpoint; keeps the TLS connection alive between refreshes"""
+    session = requests.Session()
+    # POST isn't in Retry's default allowed methods, so status retries never replay a
+    # single-use authorization code; only failed connects are retried for token calls
+    retry = Retry(total=3, backoff_factor=0.2, status_forcelist=[429, 500, 502, 503, 504])
+    session.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=retry))
+    return session
+
+
+token_session = _build_token_session()
+
 
 class DocuSignOAuth:
     def __init__(self):
@@ -14,10 +32,26 @@ class DocuSignOAuth:
         self.base_path = os.getenv('DOCUSIGN_BASE_PATH', 'https://demo.docusign.net/restapi')
         self.auth_server = os.getenv('DOCUSIGN_AUTH_SERVER', 'https://account-d.docusign.com')
 
+        # Constant for the life of the object, so build the token request headers once
+        basic_auth = base64.b64encode(f"{self.integration_key}:{self.secret_key}".encode()).decode()
+        self._token_headers = {
+            'Authorization': f'Basic {basic_auth}',
+            'Content-Type': 'application/x-www-form-urlencoded'
+        }
+        self._token_url = f"{self.auth_server}/oauth/token"
+        self._auth_url_base = f"{self.auth_server}/oauth/auth?" + urlencode({
+            'response_type': 'code',
+            'scope': 'signature',
+            'client_id': self.integration_key,
+            'redirect_uri': self.redirect_uri
+        })
+
         # Token storage (in production, use database or secure storage)
         self.access_token = None
         self.refresh_token = None
         self.token_expires_at = None
+        # Serializes refreshes so concurrent requests don't each hit the token endpoint
+        self._token_lock = threading.Lock()
 
     def get_authorization_url(self, state: str = None) -> str:
         """
@@ -29,18 +63,8 @@ class DocuSignOAuth:
         Returns:
             Authorization URL
         """
-        params = {
-            'response_type': 'code',
-            'scope': 'signature',
-            'client_id': self.integration_key,
-            'redirect_uri': self.redirect_uri
-        }
-
-        if state:
-            params['state'] = state
-
-        auth_url = f"{self.auth_server}/oauth/auth?" + urlencode(params)
-        logger.info(f"Generated authorization URL: {auth_url}")
+        auth_url = f"{self._auth_url_base}&state={quote(state, safe='')}" if state else self._auth_url_base
+        logger.debug("Generated authorization URL: %s", auth_url)
         return auth_url
 
     def exchange_code_for_token(self, authorization_code):
@@ -54,25 +78,17 @@ class DocuSignOAuth:
             Token information dictionary
         """
         try:
-            # Prepare authentication header
-            auth_string = f"{self.integration_key}:{self.secret_key}"
-            auth_bytes = base64.b64encode(auth_string.encode()).decode()
-
-            headers = {
-                'Authorization': f'Basic {auth_bytes}',
-                'Content-Type': 'application/x-www-form-urlencoded'
-            }
-
             data = {
                 'grant_type': 'authorization_code',
                 'code': authorization_code,
                 'redirect_uri': self.redirect_uri
             }
 
-            response = requests.post(
-                f"{self.auth_server}/oauth/token",
-                headers=headers,
-                data=data
+            response = token_session.post(
+                self._token_url,
+                headers=self._token_headers,
+                data=data,
+                timeout=TOKEN_TIMEOUT
             )
 
             if response.status_code == 200:
@@ -105,23 +121,16 @@ class DocuSignOAuth:
             raise Exception("No refresh token available")
 
         try:
-            auth_string = f"{self.integration_key}:{self.secret_key}"
-            auth_bytes = base64.b64encode(auth_string.encode()).decode()
-
-            headers = {
-                'Authorization': f'Basic {auth_bytes}',
-                'Content-Type': 'application/x-www-form-urlencoded'
-            }
-
             data = {
                 'grant_type': 'refresh_token',
                 'refresh_token': self.refresh_token
             }
 
-            response = requests.post(
-                f"{self.auth_server}/oauth/token",
-                headers=headers,
-                data=data
+            response = token_session.post(
+                self._token_url,
+                headers=self._token_headers,
+                data=data,
+                timeout=TOKEN_TIMEOUT
             )
 
             if response.status_code == 200:
@@ -151,19 +160,26 @@ class DocuSignOAuth:
         Returns:
             Valid access token
         """
-        # Check if we have a token and it's not expired
-        if self.access_token and self.token_expires_at:
-            # Add 5 minute buffer before expiration
-            if time.time() < (self.token_expires_at - 300):
-                return self.access_token
+        # Fast path without the lock
+        if self._token_fresh():
+            return self.access_token
 
-        # Token is expired or doesn't exist, try to refresh
-        if self.refresh_token:
-            try:
-                self.refresh_access_token()
+        with self._token_lock:
+            # Another thread may have refreshed while we waited for the lock
+            if self._token_fresh():
                 return self.access_token
-            except Exception as e:
-                logger.error(f"Failed to refresh token: {e}")
-                raise Exception("Access token expired and refresh failed. Re-authorization required.")
+
+            # Token is expired or doesn't exist, try to refresh
+            if self.refresh_token:
+                try:
+                    self.refresh_access_token()
+                    return self.access_token
+                except Exception as e:
+                    logger.error(f"Failed to refresh token: {e}")
+                    raise Exception("Access token expired and refresh failed. Re-authorization required.")
 
         raise Exception("No valid access token available. Authorization required.")
+
+    def _token_fresh(self) -> bool:
+        # Add 5 minute buffer before expiration
+        return bool(self.access_token and self.token_expires_at and time.time() < (self.token_expires_at - 300))
@@ -1,21 +1,24 @@
-from pydantic import BaseModel, EmailStr, Field, ConfigDict
-from typing import Optional, List, Dict, Any, Annotated
+from pydantic import BaseModel, BeforeValidator, EmailStr, Field, ConfigDict, StringConstraints
+from typing import Optional, List, Dict, Any, Annotated, Literal
+from typing_extensions import NotRequired, TypedDict
 from datetime import datetime
 from bson import ObjectId
-from enum import Enum
 
-class SigningService(str, Enum):
-    SCRIVE = "scrive"
-    DOCUSIGN = "docusign"
+# Closed sets as Literals; pydantic-core checks these with a plain set lookup
+SigningService = Literal["scrive", "docusign"]
+SigningMode = Literal["DIRECT_SIGNING", "EMAIL_NOTIFICATION"]
+SignatureService = Literal["scrive", "docusign", "selfsign"]
+SignatureStatus = Literal["pending", "sent", "signed", "completed", "failed"]
 
-class SigningMode(str, Enum):
-    DIRECT_SIGNING = "DIRECT_SIGNING"
-    EMAIL_NOTIFICATION = "EMAIL_NOTIFICATION"
+# Cheap syntactic email check done in pydantic-core; EmailStr (email_validator)
+# is kept for registration only
+Email = Annotated[str, StringConstraints(pattern=r"^[^@\s]+@[^@\s]+\.[^@\s]+$", max_length=254)]
 
-class Signer(BaseModel):
-    signer_email: EmailStr
+# Plain dict after validation; no model instance is built per signer
+class Signer(TypedDict):
+    signer_email: Email
     signer_name: str
-    mode: SigningMode = SigningMode.DIRECT_SIGNING
+    mode: NotRequired[SigningMode]  # DIRECT_SIGNING when omitted
 
 class SigningResponse(BaseModel):
     document_id: str
@@ -39,60 +42,60 @@ def validate_object_id(v):
         raise ValueError("Invalid ObjectId")
     raise ValueError("ObjectId must be a valid ObjectId or string")
 
-PyObjectId = Annotated[str, Field(validation_alias="validate_object_id")]
+PyObjectId = Annotated[str, BeforeValidator(validate_object_id)]
 
 # User models
 class UserBase(BaseModel):
-    email: EmailStr
+    email: Email
     full_name: str
     is_active: bool = True
     is_admin: bool = False
 
 class UserCreate(UserBase):
+    email: EmailStr
     password: str
 
 class UserUpdate(BaseModel):
-    email: Optional[EmailStr] = None
+    email: Optional[Email] = None
     full_name: Optional[str] = None
     is_active: Optional[bool] = None
     is_admin: Optional[bool] = None
 
 class UserInDB(UserBase):
-    id: str = Field(alias="_id")
+    id: PyObjectId = Field(alias="_id")
     hashed_password: str
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: Optional[datetime] = None
 
     model_config = ConfigDict(
         populate_by_name=True,
-        arbitrary_types_allowed=True,
-        json_encoders={ObjectId: str}
+        arbitrary_types_allowed=True
     )
 
 class User(UserBase):
-    id: str = Field(alias="_id")
+    id: PyObjectId = Field(alias="_id")
     created_at: datetime
     updated_at: Optional[datetime] = None
 
     model_config = ConfigDict(
         populate_by_name=True,
-        arbitrary_types_allowed=True,
-        json_encoders={ObjectId: str}
+        arbitrary_types_allowed=True
     )
 
 # Signature models
 class SignatureBase(BaseModel):
     document_id: str
     signature_request_id: str
-    signer_email: EmailStr
+    signer_email: Email
     signer_name: str
-    service: str  # 'scrive' or 'docusign'
+    service: SignatureService
     status: str = "pending"  # pending, sent, signed, completed, failed
     signing_url: Optional[str] = None
     metadata: Optional[Dict[str, Any]] = None
 
 class SignatureCreate(SignatureBase):
     user_id: str
+    status: SignatureStatus = "pending"
 
 class SignatureUpdate(BaseModel):
     status: Optional[str] = None
@@ -101,23 +104,22 @@ class SignatureUpdate(BaseModel):
     metadata: Optional[Dict[str, Any]] = None
 
 class SignatureInDB(SignatureBase):
-    id: str = Field(alias="_id")
-    user_id: str
+    id: PyObjectId = Field(alias="_id")
+    user_id: PyObjectId
     signed_at: Optional[datetime] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: Optional[datetime] = None
 
     model_config = ConfigDict(
         populate_by_name=True,
-        arbitrary_types_allowed=True,
-        json_encoders={ObjectId: str}
+        arbitrary_types_allowed=True
     )
 
 class Signature(BaseModel):
-    id: str = Field(alias="_id")
+    id: PyObjectId = Field(alias="_id")
     document_id: str
     signature_request_id: str
-    user_id: str
+    user_id: PyObjectId
     signer_email: str
     signer_name: str
     service: str
@@ -134,8 +136,7 @@ class Signature(BaseModel):
 
     model_config = ConfigDict(
         populate_by_name=True,
-        arbitrary_types_allowed=True,
-        json_encoders={ObjectId: str, datetime: str}
+        arbitrary_types_allowed=True
     )
 
 
@@ -155,12 +156,13 @@ class TokenData(BaseModel):
     email: Optional[str] = None
 
 class UserLogin(BaseModel):
+    # Same EmailStr normalization as registration, so the stored address is found
     email: EmailStr
     password: str
 
 class UserResponse(BaseModel):
     id: str
-    email: EmailStr
+    email: Email
     full_name: str
     is_active: bool
     is_admin: bool
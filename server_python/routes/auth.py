@@ -1,8 +1,10 @@
 # routes/auth.py
+import logging
 from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import ORJSONResponse
 from fastapi.security import OAuth2PasswordRequestForm
-from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.asynchronous.database import AsyncDatabase
 from database import get_database
 from models import Token, UserCreate, UserResponse, UserLogin, UserInDB
 import auth
@@ -15,10 +17,12 @@ from auth import (
 )
 import crud
 
-router = APIRouter(prefix="/api/auth", tags=["authentication"])
+logger = logging.getLogger(__name__)
 
-@router.post("/register", response_model=UserResponse)
-async def register(user: UserCreate, db: AsyncIOMotorDatabase = Depends(get_database)):
+router = APIRouter(prefix="/api/auth", tags=["authentication"], default_response_class=ORJSONResponse)
+
+@router.post("/register", response_model=None, responses={200: {"model": UserResponse}})
+async def register(user: UserCreate, db: AsyncDatabase = Depends(get_database)):
     """Register a new user"""
     # Check if user already exists
     existing_user = await crud.get_user_by_email(db, email=user.email)
@@ -31,7 +35,7 @@ async def register(user: UserCreate, db: AsyncIOMotorDatabase = Depends(get_data
     # Create user
     created_user = await crud.create_user(db=db, user=user)
 
-    return UserResponse(
+    return UserResponse.model_construct(
         id=created_user.id,
         email=created_user.email,
         full_name=created_user.full_name,
@@ -40,10 +44,10 @@ async def register(user: UserCreate, db: AsyncIOMotorDatabase = Depends(get_data
         created_at=created_user.created_at
     )
 
-@router.post("/login", response_model=Token)
-async def login(user_credentials: UserLogin, db: AsyncIOMotorDatabase = Depends(get_database)):
+@router.post("/login", response_model=None, responses={200: {"model": Token}})
+async def login(user_credentials: UserLogin, db: AsyncDatabase = Depends(get_database)):
     """Login with email and password"""
-    print("In login")
+    logger.debug("Login attempt")
     user = await authenticate_user(db, user_credentials.email, user_credentials.password)
     if not user:
         raise HTTPException(
@@ -59,10 +63,10 @@ async def login(user_credentials: UserLogin, db: AsyncIOMotorDatabase = Depends(
     return {"access_token": access_token, "token_type": "bearer"}
 
 # Alternative OAuth2 compatible login endpoint
-@router.post("/token", response_model=Token)
+@router.post("/token", response_model=None, responses={200: {"model": Token}})
 async def login_for_access_token(
         form_data: OAuth2PasswordRequestForm = Depends(),
-        db: AsyncIOMotorDatabase = Depends(get_database)
+        db: AsyncDatabase = Depends(get_database)
 ):
     """OAuth2 compatible token endpoint"""
     user = await authenticate_user(db, form_data.username, form_data.password)
@@ -78,10 +82,10 @@ async def login_for_access_token(
     )
     return {"access_token": access_token, "token_type": "bearer"}
 
-@router.get("/me", response_model=UserResponse)
+@router.get("/me", response_model=None, responses={200: {"model": UserResponse}})
 async def read_users_me(current_user: UserInDB = Depends(get_current_active_user)):
     """Get current user info"""
-    return UserResponse(
+    return UserResponse.model_construct(
         id=current_user.id,
         email=current_user.email,
         full_name=current_user.full_name,
@@ -1,48 +1,140 @@
-import base64, json, logging, pprint, requests
-from models import SigningMode
+import asyncio, httpx, logging, orjson, requests, shutil, threading, time
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 BASE_URL='https://api-testbed.scrive.com'
+_GET_URL = BASE_URL + '/api/v2/documents/{}/get'
+_FILES_URL = BASE_URL + '/api/v2/documents/{}/files/main'
 FILE_PATH='C:/Users/kmca04/tmp/dummy.pdf'
 LOGIN_EMAIL='magnuscarlhammar@yahoo.se'
 LOGIN_PASSWORD='SigneTester12'
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-auth_headers = None
+
+def _build_session() -> requests.Session:
+    """Pooled session for the Scrive API; keeps TCP/TLS connections alive between calls"""
+    session = requests.Session()
+    # POST isn't in Retry's default allowed methods, so non-idempotent calls are only
+    # retried when the connection itself failed
+    retry = Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+    session.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=retry))
+    return session
+
+
+_SESSION = _build_session()
+
+# Personal token headers are reused until they expire or Scrive rejects them with a 401
+TOKEN_TTL = 55 * 60
+# Reentrant: a 401 from the token endpoint runs the invalidate hook while login holds it
+_token_lock = threading.RLock()
+_token_cache = {"headers": None, "expires_at": 0.0}
+
 id = None
 
-def login(email=LOGIN_EMAIL, password=LOGIN_PASSWORD):
-    print("login")
-    if auth_headers:
-        return auth_headers
 
-    rsp = requests.post(BASE_URL + "/api/v2/getpersonaltoken", data={"email":email, "password":password})
+def invalidate_token():
+    """Drop the cached token so the next call logs in again"""
+    with _token_lock:
+        _token_cache["headers"] = None
+        _token_cache["expires_at"] = 0.0
 
-    if rsp.status_code != 200:
-        raise Exception('Failed to login')
-    else:
-        j = rsp.json()
-        header = 'oauth_signature_method="PLAINTEXT", '
-        header += 'oauth_consumer_key="' + j['apitoken'] + '", '
-        header += 'oauth_token="' + j['accesstoken'] + '", '
-        header += 'oauth_signature="' + j['apisecret'] + '&' + j['accesssecret'] + '"'
-        return {'Authorization': header}
+
+def _invalidate_on_401(response, *args, **kwargs):
+    if response.status_code == 401:
+        invalidate_token()
+
+
+_SESSION.hooks["response"].append(_invalidate_on_401)
+
+
+async def _ainvalidate_on_401(response):
+    if response.status_code == 401:
+        invalidate_token()
+
+
+# Non-blocking client for the async API (search); the sync flows stay on _SESSION.
+# HTTP/2 lets concurrent searches share one TLS connection. Pool limits belong on the
+# transport: the client ignores its own limits when a transport is passed
+_ASYNC_CLIENT = httpx.AsyncClient(
+    transport=httpx.AsyncHTTPTransport(
+        http2=True,
+        retries=3,
+        limits=httpx.Limits(max_connections=20, max_keepalive_connections=10)
+    ),
+    timeout=httpx.Timeout(10.0, connect=3.05),
+    event_hooks={"response": [_ainvalidate_on_401]}
+)
+
+
+async def aclose():
+    """Close the async client's pooled connections; call on application shutdown"""
+    await _ASYNC_CLIENT.aclose()
+
+
+def _cached_headers():
+    if _token_cache["headers"] and time.monotonic() < _token_cache["expires_at"]:
+        return _token_cache["headers"]
+    return None
+
+
+def login(email=LOGIN_EMAIL, password=LOGIN_PASSWORD):
+    logger.debug("login")
+    # Fast path without the lock
+    headers = _cached_headers()
+    if headers:
+        return headers
+
+    with _token_lock:
+        # Another thread may have logged in while we waited for the lock
+        headers = _cached_headers()
+        if headers:
+            return headers
+
+        rsp = _SESSION.post(BASE_URL + "/api/v2/getpersonaltoken", data={"email":email, "password":password})
+
+        if rsp.status_code != 200:
+            raise Exception('Failed to login')
+        else:
+            j = rsp.json()
+            header = 'oauth_signature_method="PLAINTEXT", '
+            header += 'oauth_consumer_key="' + j['apitoken'] + '", '
+            header += 'oauth_token="' + j['accesstoken'] + '", '
+            header += 'oauth_signature="' + j['apisecret'] + '&' + j['accesssecret'] + '"'
+            headers = {'Authorization': header}
+            _token_cache["headers"] = headers
+            _token_cache["expires_at"] = time.monotonic() + TOKEN_TTL
+            return headers
+
+# Party structure is constant apart from a few per-signer fields; built once at import
+_AUTHOR_PARTY = {
+    "signatory_role": "viewer",
+    "is_author": True,
+    "is_signatory": False,
+    "sign_order": 1,
+    "delivery_method": "email",
+    "authentication_method_to_sign": "standard",
+    "authentication_method_to_view": "standard",
+    "authentication_method_to_view_archived": "standard",
+    "confirmation_delivery_method": "email",
+    "notification_delivery_method": "email",
+}
+
+_SIGNER_PARTY_TEMPLATE = {
+    "signatory_role": "signing_party",
+    "is_author": False,
+    "is_signatory": True,
+    "authentication_method_to_sign": "standard",
+    "authentication_method_to_view": "standard",
+    "authentication_method_to_view_archived": "standard",
+    "confirmation_delivery_method": "email",
+}
 
 def create_author_party():
     """Create the author party using LOGIN_EMAIL"""
-    party = {
-        "signatory_role": "viewer",
-        "is_author": True,
-        "is_signatory": False,
-        "sign_order": 1,
-        "delivery_method": "email",
-        "authentication_method_to_sign": "standard",
-        "authentication_method_to_view": "standard",
-        "authentication_method_to_view_archived": "standard",
-        "confirmation_delivery_method": "email",
-        "notification_delivery_method": "email",
+    # fields is built per call so callers can't mutate a list shared with the template
+    return {
+        **_AUTHOR_PARTY,
         "fields": [
             {
                 "type": "email",
@@ -54,20 +146,13 @@ def create_author_party():
             }
         ]
     }
-    return party
 
 def create_signer_party(email, name, sign_order=2, delivery_method="api"):
     """Create a signer party (now starts from sign_order=2)"""
     party = {
-        "signatory_role": "signing_party",
-        "is_author": False,
-        "is_signatory": True,
+        **_SIGNER_PARTY_TEMPLATE,
         "sign_order": sign_order,
-        "delivery_method": "api" if delivery_method == SigningMode.DIRECT_SIGNING else "email",
-        "authentication_method_to_sign": "standard",
-        "authentication_method_to_view": "standard",
-        "authentication_method_to_view_archived": "standard",
-        "confirmation_delivery_method": "email",
+        "delivery_method": "api" if delivery_method == "DIRECT_SIGNING" else "email",
         "notification_delivery_method": "none" if delivery_method == "api" else "email",
         "fields": [
             {
@@ -82,13 +167,19 @@ def create_signer_party(email, name, sign_order=2, delivery_method="api"):
     }
     return party
 
+def _build_tags(metadata):
+    """Convert metadata to Scrive tags format; the title is sent separately, not as a tag"""
+    if not metadata:
+        return []
+    return [{"name": key, "value": str(value)} for key, value in metadata.items() if key != 'title']
+
 def new_request(file_content_bytes, auth_headers):
-    print("new_request")
-    file_data = base64.b64encode(file_content_bytes)
-    data = {"file": file_data}
+    logger.debug("new_request")
+    # Sent as a raw multipart file part; no base64 pass or urlencoded copy of the PDF
+    files = {"file": ("document.pdf", file_content_bytes, "application/pdf")}
 
-    rsp = requests.post(BASE_URL + '/api/v2/documents/new',
-                        data=data,
+    rsp = _SESSION.post(BASE_URL + '/api/v2/documents/new',
+                        files=files,
                         headers=auth_headers)
     j = rsp.json()
     id = j['id']
@@ -97,42 +188,34 @@ def new_request(file_content_bytes, auth_headers):
     return id
 
 def update_with_signers(id, signers, auth_headers, metadata=None):
-    print("update_with_signers")
-    print(id)
+    logger.debug("update_with_signers %s", id)
     parties = []
 
     author_party = create_author_party()
     parties.append(author_party)
 
     for i, signer in enumerate(signers, 2):
-        email = signer.signer_email
-        name = signer.signer_name
-        delivery_method = signer.mode
+        email = signer["signer_email"]
+        name = signer["signer_name"]
+        delivery_method = signer["mode"]
 
         party = create_signer_party(email, name, sign_order=i, delivery_method=delivery_method)
         parties.append(party)
 
-    tags = []
-    for key, value in metadata.items():
-        if key != 'title':  # Don't duplicate title in tags
-            tags.append({
-                "name": key,
-                "value": str(value)
-            })
-    # Create document data without tags
     document_data = {
         "title": metadata.get('title', 'Document to Sign') if metadata else "Document to Sign",
         "parties": parties,
-        "tags": tags
+        "tags": _build_tags(metadata)
     }
 
     data = {
         "document_id": id,
-        "document": json.dumps(document_data),
-        #"tags": json.dumps(tags)
+        # orjson returns bytes, which requests form-encodes as-is
+        "document": orjson.dumps(document_data),
+        #"tags": orjson.dumps(tags)
     }
 
-    response = requests.post(
+    response = _SESSION.post(
         BASE_URL + '/api/v2/documents/' + str(id) + '/update',
         data=data,
         headers=auth_headers
@@ -148,50 +231,38 @@ def update_document_tags(document_id, metadata, auth_headers):
     if not metadata:
         return
 
-    print("update_document_tags")
-
-    # Convert metadata to Scrive tags format
-    tags = []
-    for key, value in metadata.items():
-        if key != 'title':  # Don't duplicate title in tags
-            tags.append({
-                "name": key,
-                "value": str(value)
-            })
+    logger.debug("update_document_tags %s", document_id)
 
+    tags = _build_tags(metadata)
     if not tags:
         return
 
     url = f"{BASE_URL}/api/v2/documents/{document_id}/tags/update"
     data = {
         "document_id": document_id,
-        "tags": json.dumps(tags)
+        "tags": orjson.dumps(tags)
     }
 
-    response = requests.post(url, data=data, headers=auth_headers)
+    response = _SESSION.post(url, data=data, headers=auth_headers)
 
-    print(response.content)
     if response.status_code != 200:
-        print(f"Warning: Failed to update tags: {response.status_code} - {response.text}")
+        logger.warning("Failed to update tags: %s - %s", response.status_code, response.text)
     else:
-        print(f"Successfully updated tags for document {document_id}")
+        logger.debug("Updated tags for document %s", document_id)
 
 
 
 def start_process(id, auth_headers):
-    print("start_process")
+    logger.debug("start_process %s", id)
     url = BASE_URL + '/api/v2/documents/' + id + '/start'
     data = {"document_id": id}
-    response = requests.post(url, data=data, headers=auth_headers).json()
-    print("Getting start process")
+    response = _SESSION.post(url, data=data, headers=auth_headers).json()
 
     if 'parties' not in response:
         raise Exception(f"Failed to start document process. Status code: {response.status_code}")
-    print("Returning json from start")
     return response['parties']
 
 def get_sign_urls(parties):
-    print("get_sign_urls")
     signing_urls = []
     for party in parties:
         email = party['fields'][0]['value']
@@ -200,7 +271,7 @@ def get_sign_urls(parties):
         signing_urls.append({
             "signer_email": email,
             "signing_url": signing_url,
-            "mode": SigningMode.DIRECT_SIGNING if delivery_method == "api" else SigningMode.EMAIL_NOTIFICATION
+            "mode": "DIRECT_SIGNING" if delivery_method == "api" else "EMAIL_NOTIFICATION"
         })
     return signing_urls
 
@@ -216,7 +287,7 @@ def initiate_signing_process(file, signers, metadata=None):
     #if metadata:
     #    update_document_tags(id, metadata, auth_headers)
 
-    print(parties)
+    logger.debug("Parties: %s", parties)
     urls = get_sign_urls(parties)
     return id, urls
 
@@ -226,12 +297,12 @@ def get_document_metadata(document_id):
     """
     Retrieve metadata from a Scrive document (document level only)
     """
-    print(f"get_document_metadata for ID: {document_id}")
+    logger.debug("get_document_metadata for ID: %s", document_id)
 
     try:
         auth_headers = login()
-        url = f"{BASE_URL}/api/v2/documents/{document_id}/get"
-        response = requests.get(url, headers=auth_headers)
+        url = _GET_URL.format(document_id)
+        response = _SESSION.get(url, headers=auth_headers)
         response.raise_for_status()
 
         document_data = response.json()
@@ -255,27 +326,24 @@ def get_document_metadata(document_id):
         return metadata
 
     except requests.exceptions.RequestException as e:
-        print(f"Error getting document metadata: {e}")
-        return {}
-
-
-    except requests.exceptions.RequestException as e:
-        print(f"Error getting document metadata: {e}")
+        logger.error("Error getting document metadata: %s", e)
         return {}
 
 def get_document_status(document_id):
-    print(f"get_document_status for ID: {document_id}")
+    logger.debug("get_document_status for ID: %s", document_id)
 
-    url = f"{BASE_URL}/api/v2/documents/{document_id}/get"
+    url = _GET_URL.format(document_id)
 
     try:
         auth_headers = login()
-        response = requests.get(url, headers=auth_headers)
+        response = _SESSION.get(url, headers=auth_headers)
         response.raise_for_status()
 
         document_data = response.json()
 
-        print(json.dumps(document_data, indent=4))
+        # Pretty-printing the whole document is only worth it when someone reads it
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Document data:\n%s", orjson.dumps(document_data, option=orjson.OPT_INDENT_2).decode())
 
         # Extract relevant status information
         status_info = {
@@ -297,14 +365,13 @@ def get_document_status(document_id):
                 }
                 status_info['parties'].append(party_info)
 
-        print(f"Document status: {status_info['status']}")
-        print(f"Signed: {status_info['signed']}")
-        print(f"Number of parties: {len(status_info['parties'])}")
+        logger.debug("Document status: %s, signed: %s, parties: %d",
+                     status_info['status'], status_info['signed'], len(status_info['parties']))
 
         return status_info
 
     except requests.exceptions.RequestException as e:
-        print(f"Error getting document status: {e}")
+        logger.error("Error getting document status: %s", e)
         raise Exception(f"Failed to get document status: {e}")
 
 def get_document(document_id, signed=True):
@@ -318,46 +385,89 @@ def get_document(document_id, signed=True):
     Returns:
         bytes: The document content as bytes
     """
-    print(f"get_document for ID: {document_id}, signed: {signed}")
+    logger.debug("get_document for ID: %s, signed: %s", document_id, signed)
     auth_headers = login()
 
-    if signed:
-        url = f"{BASE_URL}/api/v2/documents/{document_id}/files/main"
-    else:
-        url = f"{BASE_URL}/api/v2/documents/{document_id}/files/main"
-
+    # Scrive serves a single main file: the sealed PDF once the document is closed,
+    # the original before that; `signed` doesn't select a different endpoint
     try:
-        response = requests.get(url, headers=auth_headers)
+        response = _SESSION.get(_FILES_URL.format(document_id), headers=auth_headers)
         response.raise_for_status()
 
-        print(f"Downloaded document, size: {len(response.content)} bytes")
+        logger.debug("Downloaded document, size: %d bytes", len(response.content))
         return response.content
 
     except requests.exceptions.RequestException as e:
-        print(f"Error downloading document: {e}")
+        logger.error("Error downloading document: %s", e)
+        raise Exception(f"Failed to download document: {e}")
+
+def _open_document(document_id):
+    """Start a streamed download of the document's main file; the caller closes the response"""
+    auth_headers = login()
+    try:
+        response = _SESSION.get(_FILES_URL.format(document_id), headers=auth_headers, stream=True)
+    except requests.exceptions.RequestException as e:
+        logger.error("Error downloading document: %s", e)
         raise Exception(f"Failed to download document: {e}")
 
+    if not response.ok:
+        detail = f"{response.status_code} - {response.text}"
+        response.close()
+        logger.error("Error downloading document: %s", detail)
+        raise Exception(f"Failed to download document: {detail}")
+    return response
+
+def _iter_response(response, chunk_size):
+    with response:
+        yield from response.iter_content(chunk_size=chunk_size)
+
+def get_document_stream(document_id, chunk_size=64 * 1024):
+    """
+    Stream a document from Scrive API instead of loading it into memory
+
+    Errors are raised before the first chunk is returned, so callers can still
+    turn them into an error response.
+
+    Args:
+        document_id (str): The ID of the document to download
+        chunk_size (int): Bytes per yielded chunk
+
+    Returns:
+        Iterator over the document bytes
+    """
+    logger.debug("get_document_stream for ID: %s", document_id)
+    return _iter_response(_open_document(document_id), chunk_size)
+
 def save_document(document_id, output_path=None, signed=True):
     """
     Download and save a document from Scrive API to file
     """
-    auth_headers = login()
-    document_content = get_document(document_id, signed)
-
     if not output_path:
         suffix = "_signed" if signed else "_original"
         output_path = f"document_{document_id}{suffix}.pdf"
 
-    with open(output_path, 'wb') as f:
-        f.write(document_content)
+    # Copy straight from the socket to the file in 64 KiB blocks
+    with _open_document(document_id) as response, open(output_path, 'wb') as f:
+        response.raw.decode_content = True
+        shutil.copyfileobj(response.raw, f, 64 * 1024)
 
-    print(f"Document saved to: {output_path}")
+    logger.info("Document saved to: %s", output_path)
     return output_path
 
+def _field_matches(document_info, key, value_lc):
+    """Case-insensitive substring match of one search filter against a document"""
+    if key == 'title':
+        return value_lc in document_info['title'].lower()
+    # Check if metadata contains the search parameter
+    # This now includes 'handler' and 'system' automatically
+    doc_value = document_info['metadata'].get(key)
+    return doc_value is not None and value_lc in doc_value.lower()
+
 async def search_documents(search_params, limit, offset):
     """Search Scrive documents using documentlist API"""
     try:
-        auth_headers = login()
+        # login() is blocking on a cold cache, so keep it off the event loop
+        auth_headers = await asyncio.to_thread(login)
 
         # Scrive documentlist API endpoint
         url = f"{BASE_URL}/api/v2/documents/list"
@@ -380,12 +490,19 @@ async def search_documents(search_params, limit, offset):
             scrive_status = status_mapping.get(search_params['status'].lower(), search_params['status'])
             params['filter'] = scrive_status
 
-        response = requests.get(url, headers=auth_headers, params=params)
+        response = await _ASYNC_CLIENT.get(url, headers=auth_headers, params=params)
         response.raise_for_status()
 
         documents_data = response.json()
         results = []
 
+        # Lowercase the filter values once instead of per document. Longer values tend to be
+        # more selective, so they're checked first; empty values match everything and are dropped
+        filters = sorted(
+            ((k, v.lower()) for k, v in search_params.items() if k != 'status' and v),
+            key=lambda kv: -len(kv[1])
+        )
+
         # Process each document and filter by metadata
         for doc in documents_data.get('documents', []):
             document_info = {
@@ -412,29 +529,14 @@ async def search_documents(search_params, limit, offset):
                 document_info['metadata']['title'] = doc['title']
 
             # Filter by metadata parameters (including handler and system)
-            matches = True
-            for param_key, param_value in search_params.items():
-                if param_key == 'status':
-                    continue  # Already handled above
-                elif param_key == 'title':
-                    if param_value.lower() not in document_info['title'].lower():
-                        matches = False
-                        break
-                else:
-                    # Check if metadata contains the search parameter
-                    # This now includes 'handler' and 'system' automatically
-                    doc_value = document_info['metadata'].get(param_key, '').lower()
-                    if param_value.lower() not in doc_value:
-                        matches = False
-                        break
-
-            if matches:
+            # (status is already handled by the API filter above)
+            if all(_field_matches(document_info, k, v) for k, v in filters):
                 results.append(document_info)
 
         logger.info(f"Found {len(results)} matching documents")
         return results
 
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         logger.error(f"Scrive API error during search: {e}")
         raise Exception(f"Failed to search Scrive documents: {e}")
     except Exception as e:
@@ -1,18 +1,21 @@
 # Try this import order in server.py:
-from fastapi import FastAPI, File, UploadFile, Form, HTTPException, Path, Query, Request, Response, Depends
-from fastapi.responses import JSONResponse, RedirectResponse
+from fastapi import FastAPI, File, UploadFile, Form, HTTPException, Path, Query, Request, Depends
+from fastapi.responses import JSONResponse, ORJSONResponse, RedirectResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+from pymongo.asynchronous.database import AsyncDatabase
 from bson import ObjectId
-from typing import Optional, Dict, Any, List
-from datetime import datetime
+from typing import Optional, Dict, Any, List, get_args
+from datetime import datetime, timezone
+from pydantic import TypeAdapter, ValidationError
 
-import json
+import asyncio
 import logging
-import traceback
+import queue
+from logging.handlers import QueueHandler, QueueListener
 
 # Import models first
-from models import SigningService, Signer, SigningResponse, DocumentStatus, SigningMode, SignatureCreate, UserInDB, Signature
+from models import SigningService, Signer, SigningResponse, DocumentStatus, SignatureCreate, UserInDB, Signature
 
 # Then database
 from database import get_database, connect_to_mongo, close_mongo_connection
@@ -34,17 +37,29 @@ from docusign import DocuSignService
 from docusign_oauth import DocuSignOAuth
 
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging; handlers write from a listener thread so the event loop only enqueues
+_log_queue = queue.SimpleQueue()
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+_log_listener = QueueListener(_log_queue, _log_handler)
+_log_listener.start()
+logging.basicConfig(level=logging.INFO, handlers=[QueueHandler(_log_queue)])
 logger = logging.getLogger(__name__)
 
+MAX_UPLOAD_SIZE = 10 * 1024 * 1024  # 10MB
+
+_SIGNATURE_LIST = TypeAdapter(List[Signature])
+_SIGNERS_ADAPTER = TypeAdapter(List[Signer])
+_METADATA_ADAPTER = TypeAdapter(Dict[str, Any])
+
 docusign_oauth = DocuSignOAuth()
 docusign = DocuSignService(docusign_oauth)
 
 app = FastAPI(
     title="Document Signing API",
     description="API for document signing with multiple service providers",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 app.add_middleware(
@@ -68,19 +83,22 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     await close_mongo_connection()
+    await scrive.aclose()
     print("Application shutdown complete")
+    _log_listener.stop()
 
 # Service validation function
+SUPPORTED_SERVICES = get_args(SigningService)
+
 def validate_service(service):
     """Validate and return the signing service"""
-    try:
-        return SigningService(service.lower())
-    except ValueError:
-        supported_services = [s.value for s in SigningService]
+    validated = service.lower()
+    if validated not in SUPPORTED_SERVICES:
         raise HTTPException(
             status_code=400,
-            detail=f"Unsupported service '{service}'. Supported services: {supported_services}"
+            detail=f"Unsupported service '{service}'. Supported services: {list(SUPPORTED_SERVICES)}"
         )
+    return validated
 
 # API Endpoints
 @app.post("/api/{service}/sign", response_model=SigningResponse)
@@ -90,7 +108,7 @@ async def initiate_signing_process(
         signers: str = Form(..., description="JSON array of signers with email, name, and mode"),
         metadata: str = Form(None, description="Optional metadata as JSON string"),
         current_user: UserInDB = Depends(get_current_active_user),
-        db: AsyncIOMotorDatabase = Depends(get_database)
+        db: AsyncDatabase = Depends(get_database)
 ):
     """
     Initiate the document signing process with specified service and multiple signers
@@ -103,45 +121,51 @@ async def initiate_signing_process(
     try:
         # Validate service
         validated_service = validate_service(service)
-        metadata_data = json.loads(metadata) if metadata else {}
+        metadata_data = _METADATA_ADAPTER.validate_json(metadata) if metadata else {}
 
-        # Parse signers JSON
+        # Parse and validate the signers JSON in one pydantic-core pass
         try:
-            signers_data = json.loads(signers)
-            # Validate each signer using Pydantic
-            signer_objects = [Signer(**signer) for signer in signers_data]
-        except json.JSONDecodeError:
-            raise HTTPException(status_code=400, detail="Invalid JSON format for signers")
-        except Exception as e:
+            signer_objects = _SIGNERS_ADAPTER.validate_json(signers)
+        except ValidationError as e:
+            if any(error["type"] == "json_invalid" for error in e.errors()):
+                raise HTTPException(status_code=400, detail="Invalid JSON format for signers")
             raise HTTPException(status_code=400, detail=f"Invalid signer data: {str(e)}")
 
         if not signer_objects:
             raise HTTPException(status_code=400, detail="At least one signer is required")
+        for signer in signer_objects:
+            signer.setdefault("mode", "DIRECT_SIGNING")
 
-        logger.info(f"Initiating signing process with {validated_service.value} service for {len(signer_objects)} signers")
+        logger.info(f"Initiating signing process with {validated_service} service for {len(signer_objects)} signers")
 
         # Validate file type
         if not document.filename.lower().endswith('.pdf'):
             raise HTTPException(status_code=400, detail="Only PDF files are supported")
 
-        # Validate file size (e.g., max 10MB)
-        file_content = await document.read()
-        if len(file_content) > 10 * 1024 * 1024:  # 10MB
-            raise HTTPException(status_code=400, detail="File size too large (max 10MB)")
+        # Validate file size (e.g., max 10MB) while reading, so oversized uploads
+        # are rejected after 10MB instead of being read into memory in full
+        chunks = []
+        size = 0
+        while chunk := await document.read(1 << 20):
+            size += len(chunk)
+            if size > MAX_UPLOAD_SIZE:
+                raise HTTPException(status_code=400, detail="File size too large (max 10MB)")
+            chunks.append(chunk)
+        file_content = b"".join(chunks)
 
         # Reset file pointer for processing
         await document.seek(0)
 
-        print(signer_objects)
+        logger.debug("Signers: %s", signer_objects)
 
         # Route to appropriate service
-        if validated_service == SigningService.SCRIVE:
+        if validated_service == "scrive":
             # TODO: Integrate with Scrive service for multiple signers
             # result = scrive_service.initiate_signing_process(document, signer_objects)
 
             # Mock response with multiple signing URLs
             signing_urls = []
-            signer_data = scrive.initiate_signing_process(file_content, signer_objects, metadata_data)
+            signer_data = await asyncio.to_thread(scrive.initiate_signing_process, file_content, signer_objects, metadata_data)
             for i, signer in enumerate(signer_data[1]):
                 signing_url = signer.get('signing_url')
                 signing_urls.append({
@@ -155,7 +179,7 @@ async def initiate_signing_process(
                 service="scrive"
             )
 
-        elif validated_service == SigningService.DOCUSIGN:
+        elif validated_service == "docusign":
             # TODO: Integrate with DocuSign service for multiple signers
             # result = docusign_service.initiate_signing_process(document, signer_objects)
 
@@ -163,44 +187,42 @@ async def initiate_signing_process(
             signing_urls = []
             for i, signer in enumerate(signer_objects):
                 signing_urls.append({
-                    "signer_email": signer.signer_email,
-                    "signer_name": signer.signer_name,
+                    "signer_email": signer["signer_email"],
+                    "signer_name": signer["signer_name"],
                     "signing_url": f"https://demo.docusign.net/signing/startinsession.aspx?t=env123_signer{i+1}",
-                    "mode": signer.mode
+                    "mode": signer["mode"]
                 })
 
-            r = docusign.initiate_signing_process(file_content, signer_objects, metadata_data)
-            print("Create signing response")
+            r = await asyncio.to_thread(docusign.initiate_signing_process, file_content, signer_objects, metadata_data)
             response = SigningResponse(
                 document_id=r.get('document_id'),
                 signing_urls=r.get('signing_urls'),
                 service="docusign"
             )
-            print("SigningResposne created")
 
         # After successful signing, store signatures in MongoDB
+        signers_by_email = {s["signer_email"]: s for s in signer_objects}
+        signatures = []
         for signer_url in response.signing_urls:
             # Find the corresponding signer object
-            signer_obj = next((s for s in signer_objects if s.signer_email == signer_url["signer_email"]), None)
+            signer_obj = signers_by_email.get(signer_url["signer_email"])
             if signer_obj:
-                print("Storing signature")
-                signature_data = SignatureCreate(
+                signatures.append(SignatureCreate(
                     document_id=response.document_id,
                     signature_request_id=response.document_id,
                     user_id=current_user.id,
-                    signer_email=signer_obj.signer_email,
-                    signer_name=signer_obj.signer_name,
-                    service=service,
+                    signer_email=signer_obj["signer_email"],
+                    signer_name=signer_obj["signer_name"],
+                    service=validated_service,
                     status="sent",
                     signing_url=signer_url.get("signing_url"),
                     metadata=metadata_data
-                )
-                print("Storing in db")
+                ))
 
-                # Store in MongoDB
-                await crud.create_signature(db=db, signature=signature_data)
+        # Store in MongoDB with a single round trip for all signers
+        await crud.create_signatures_bulk(db=db, signatures=signatures)
 
-        logger.info(f"Successfully created signing document with {validated_service.value}: {response.document_id}")
+        logger.info(f"Successfully created signing document with {validated_service}: {response.document_id}")
         return response
 
     except HTTPException:
@@ -237,7 +259,7 @@ async def get_document_status(
         service: str = Path(..., description="Signing service (scrive or docusign)"),
         document_id: str = Path(..., description="Document ID"),
         current_user: UserInDB = Depends(get_current_active_user),
-        db: AsyncIOMotorDatabase = Depends(get_database)
+        db: AsyncDatabase = Depends(get_database)
 ):
     try:
         # Validate service
@@ -246,12 +268,13 @@ async def get_document_status(
 
         # Get status from external service
         if service == "scrive":
-            status_data = scrive.get_document_status(document_id)
+            status_data = await asyncio.to_thread(scrive.get_document_status, document_id)
             mapped_status = map_scrive_status(status_data.get("status", "unknown"))
         elif service == "docusign":
-            status_data = docusign.get_signing_status(document_id)
+            status_data = await asyncio.to_thread(docusign.get_signing_status, document_id)
             mapped_status = map_docusign_status(status_data.get("status", "unknown"))
         # Update all signatures for this document in the database
+        now = datetime.now(timezone.utc)
         update_result = await db.signatures.update_many(
             {
                 "document_id": document_id,
@@ -262,8 +285,8 @@ async def get_document_status(
                 "$set": {
                     "status": mapped_status,
                     "signed": status_data.get("signed", False),
-                    "updated_at": datetime.utcnow(),
-                    "last_status_check": datetime.utcnow(),
+                    "updated_at": now,
+                    "last_status_check": now,
                     # Add any other relevant fields from the status response
                     "external_status_data": status_data  # Store the full response for reference
                 }
@@ -280,7 +303,7 @@ async def get_document_status(
             "status": status_data.get("status"),
             "signed": status_data.get("signed"),
             "updated_signatures": update_result.modified_count,
-            "last_updated": datetime.utcnow().isoformat(),
+            "last_updated": now.isoformat(),
             "details": status_data
         }
 
@@ -294,18 +317,21 @@ async def get_document_status(
 async def update_signature_status(
         signature_id: str,
         current_user: UserInDB = Depends(get_current_active_user),
-        db: AsyncIOMotorDatabase = Depends(get_database)
+        db: AsyncDatabase = Depends(get_database)
 ):
     """Update a specific signature's status from the external service"""
     try:
         if not ObjectId.is_valid(signature_id):
             raise HTTPException(status_code=400, detail="Invalid signature ID")
 
-        # Get the signature from database
-        signature = await db.signatures.find_one({
-            "_id": ObjectId(signature_id),
-            "user_id": current_user.id
-        })
+        # Get the signature from database; only the fields needed for the status lookup
+        signature = await db.signatures.find_one(
+            {
+                "_id": ObjectId(signature_id),
+                "user_id": current_user.id
+            },
+            projection={"service": 1, "document_id": 1}
+        )
 
         if not signature:
             raise HTTPException(status_code=404, detail="Signature not found")
@@ -315,33 +341,31 @@ async def update_signature_status(
         document_id = signature["document_id"]
 
         if service == "scrive":
-            status_data = scrive.get_document_status(document_id)
+            status_data = await asyncio.to_thread(scrive.get_document_status, document_id)
         elif service == "docusign":
-            status_data = docusign.get_document_status(document_id)
+            status_data = await asyncio.to_thread(docusign.get_signing_status, document_id)
         else:
             raise HTTPException(status_code=400, detail="Unsupported service")
 
-        # Update the signature
-        update_result = await db.signatures.update_one(
+        # Update the signature and get the new version back in the same round trip
+        now = datetime.now(timezone.utc)
+        updated_signature = await db.signatures.find_one_and_update(
             {"_id": ObjectId(signature_id)},
             {
                 "$set": {
                     "status": status_data.get("status", "unknown"),
                     "signed": status_data.get("signed", False),
-                    "updated_at": datetime.utcnow(),
-                    "last_status_check": datetime.utcnow(),
+                    "updated_at": now,
+                    "last_status_check": now,
                     "external_status_data": status_data
                 }
-            }
+            },
+            return_document=ReturnDocument.AFTER
         )
 
-        if update_result.modified_count == 0:
+        if updated_signature is None:
             raise HTTPException(status_code=404, detail="Signature not updated")
 
-        # Return updated signature
-        updated_signature = await db.signatures.find_one({"_id": ObjectId(signature_id)})
-        updated_signature = convert_objectids_to_strings(updated_signature)
-
         return Signature(**updated_signature)
 
     except HTTPException:
@@ -366,27 +390,28 @@ async def download_signed_document(
         # Validate service
         validated_service = validate_service(service)
 
-        logger.info(f"Download request for document: {document_id} from {validated_service.value}")
+        logger.info(f"Download request for document: {document_id} from {validated_service}")
 
         # Route to appropriate service
-        if validated_service == SigningService.SCRIVE:
-
-            # Download the signed document from Scrive
-            document_content = scrive.get_document(document_id)
+        if validated_service == "scrive":
 
-            # Return the document as a file download
-            return Response(
-                content=document_content,
+            # Stream the signed document from Scrive; opening the download blocks, so it runs
+            # on a worker thread and errors surface before the response starts
+            document_stream = await asyncio.to_thread(scrive.get_document_stream, document_id)
+            return StreamingResponse(
+                document_stream,
                 media_type="application/pdf",
                 headers={
                     "Content-Disposition": f"attachment; filename=signed_document_{document_id}.pdf"
                 }
             )
 
-        elif validated_service == SigningService.DOCUSIGN:
-            document_content = docusign.get_signed_document(document_id)
-            return Response(
-                content=document_content,
+        elif validated_service == "docusign":
+            # Stream the PDF through instead of holding it in memory; the token refresh, status
+            # check and opening the download block, so they run on a worker thread
+            document_stream = await asyncio.to_thread(docusign.stream_signed_document, document_id)
+            return StreamingResponse(
+                document_stream,
                 media_type="application/pdf",
                 headers={
                     "Content-Disposition": f"attachment; filename=signed_document_{document_id}.pdf"
@@ -395,9 +420,8 @@ async def download_signed_document(
 
     except HTTPException:
         raise
-    except Exception as e:
-        traceback.print_exc()
-        logger.error(f"Error downloading document: {str(e)}")
+    except Exception:
+        logger.exception("Error downloading document")
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
@@ -426,12 +450,12 @@ async def search_documents(
         if title:
             search_params['title'] = title
 
-        logger.info(f"Searching documents with {validated_service.value}, params: {search_params}")
+        logger.info(f"Searching documents with {validated_service}, params: {search_params}")
 
         # Route to appropriate service
-        if validated_service == SigningService.SCRIVE:
+        if validated_service == "scrive":
             results = await scrive.search_documents(search_params, limit, offset)
-        elif validated_service == SigningService.DOCUSIGN:
+        elif validated_service == "docusign":
             logger.info("Calling docusign search")
             results = await docusign.search_documents(search_params, limit, offset)
 
@@ -457,7 +481,7 @@ async def search_signatures(
         status: Optional[str] = Query(None, description="Signature status"),
         service: Optional[str] = Query(None, description="Signing service"),
         current_user: UserInDB = Depends(get_current_active_user),
-        db: AsyncIOMotorDatabase = Depends(get_database)
+        db: AsyncDatabase = Depends(get_database)
 ):
     """Search signatures with various criteria"""
     try:
@@ -475,7 +499,7 @@ async def search_signatures(
             query_filter["document_id"] = document_id
 
         if signer_email:
-            query_filter["signer_email"] = {"$regex": signer_email, "$options": "i"}
+            query_filter["signer_email_lc"] = crud.signer_email_prefix(signer_email)
 
         # Handle status filter more carefully
         if status and status.strip():
@@ -498,19 +522,23 @@ async def search_signatures(
 
         logger.info(f"Found {len(signatures)} signatures")
 
-        # Convert to Pydantic models with proper ObjectId conversion
-        signature_objects = []
-        for sig in signatures:
-            try:
-                converted_sig = crud.convert_objectids_to_strings(sig)
-                signature_objects.append(Signature(**converted_sig))
-            except Exception as e:
-                logger.error(f"Error converting signature: {e}")
-                logger.error(f"Signature data: {sig}")
-                continue
+        # Convert to Pydantic models; PyObjectId fields take the raw ObjectIds
+        try:
+            # Validate the whole page in one pydantic-core call
+            signature_objects = _SIGNATURE_LIST.validate_python(signatures)
+        except ValidationError:
+            # Fall back to row by row so one malformed document doesn't hide the rest
+            signature_objects = []
+            for sig in signatures:
+                try:
+                    signature_objects.append(Signature(**sig))
+                except Exception as e:
+                    logger.error(f"Error converting signature: {e}")
+                    logger.error(f"Signature data: {sig}")
+                    continue
 
         return {
-            "signatures": [sig.dict() for sig in signature_objects],
+            "signatures": [sig.model_dump() for sig in signature_objects],
             "total": len(signature_objects),
             "query": query_filter
         }
@@ -527,7 +555,7 @@ async def search_signatures(
 async def delete_signature(
         signature_id: str,
         current_user: UserInDB = Depends(get_current_active_user),
-        db: AsyncIOMotorDatabase = Depends(get_database)
+        db: AsyncDatabase = Depends(get_database)
 ):
     """Mark a signature as deleted (soft delete)"""
     try:
@@ -535,6 +563,7 @@ async def delete_signature(
             raise HTTPException(status_code=400, detail="Invalid signature ID")
 
         # Update the signature status to deleted
+        now = datetime.now(timezone.utc)
         update_result = await db.signatures.update_one(
             {
                 "_id": ObjectId(signature_id),
@@ -544,9 +573,9 @@ async def delete_signature(
             {
                 "$set": {
                     "status": "deleted",
-                    "deleted_at": datetime.utcnow(),
+                    "deleted_at": now,
                     "deleted_by": current_user.id,
-                    "updated_at": datetime.utcnow()
+                    "updated_at": now
                 }
             }
         )
@@ -559,7 +588,7 @@ async def delete_signature(
         return {
             "message": "Signature deleted successfully",
             "signature_id": signature_id,
-            "deleted_at": datetime.utcnow().isoformat()
+            "deleted_at": now.isoformat()
         }
 
     except HTTPException:
@@ -591,9 +620,8 @@ async def health_check():
 @app.get("/auth/docusign/login")
 async def docusign_login():
     """Initiate DocuSign OAuth flow"""
-    print("Docusign login")
+    logger.debug("DocuSign login")
     auth_url = docusign_oauth.get_authorization_url(state="random_state_string")
-    print(auth_url)
     webbrowser.open(auth_url)
     #return RedirectResponse(url=auth_url)
 
@@ -601,7 +629,7 @@ async def docusign_login():
 @app.get("/auth/docusign/callback")
 async def docusign_callback(request: Request):
     """Handle DocuSign OAuth callback"""
-    print("Docusign callback")
+    logger.debug("DocuSign callback")
     try:
         # Get authorization code from query parameters
         code = request.query_params.get('code')
@@ -662,7 +690,8 @@ async def general_exception_handler(request, exc):
         content={"error": "Internal server error"}
     )
 
-#python -m uvicorn server:app --reload
+#python -m uvicorn server:app --reload --loop uvloop
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
+    # uvloop ships with uvicorn[standard]
+    uvicorn.run(app, host="0.0.0.0", port=8000, reload=True, loop="uvloop")
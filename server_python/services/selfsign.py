@@ -19,7 +19,6 @@ from pyhanko.stamp import TextStampStyle
 from pyhanko.pdf_utils.font import opentype
 from pyhanko.pdf_utils import misc
 import logging
-import traceback
 
 from .document_storage import DocumentStorageClient
 
@@ -380,11 +379,12 @@ class SelfSignService:
     def download_document(self, document_id: str) -> bytes:
         """Download the signed document"""
         logger.info("--->download_document")
-        # First try local storage
-        local_path = f"signed_documents/{document_id}.pdf"
-        if os.path.exists(local_path):
-            with open(local_path, 'rb') as f:
+        # First try local storage; open directly rather than stat-ing the path first
+        try:
+            with open(f"signed_documents/{document_id}.pdf", 'rb') as f:
                 return f.read()
+        except FileNotFoundError:
+            pass
 
         # If external storage is available, try that
         if self.ensure_authenticated():